@@ -8,39 +8,80 @@ Files:
 """
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from data.parquet_cache import load_with_sidecar, read_csv_arrow
+
+GPS_COLUMNS = ["driver_id", "order_id", "timestamp", "lon", "lat"]
+GPS_TYPES = {
+    # Few distinct drivers over many pings: dictionary-encode (category in pandas)
+    "driver_id": pa.dictionary(pa.int32(), pa.string()),
+    "order_id": pa.string(),
+    "timestamp": pa.int64(),     # Unix epoch seconds
+    # float32 (~1 m at Chengdu/Xi'an longitudes, below GPS fix noise) halves the
+    # coordinate bytes of every streamed batch and of the sidecar
+    "lon": pa.float32(),
+    "lat": pa.float32(),
+}
+# order_id is never used downstream, so it is skipped at parse time
+GPS_KEEP_COLUMNS = ["driver_id", "timestamp", "lon", "lat"]
+# Bump when the per-driver GPS sidecar's columns or types change, so stale sidecars are ignored
+GPS_SIDECAR_VERSION = 1
+GPS_BLOCK_SIZE = 256 << 20  # bytes of CSV per Arrow record batch
+
+ORDER_COLUMNS = [
+    "order_id", "start_billing", "end_billing",
+    "pickup_lon", "pickup_lat", "dropoff_lon", "dropoff_lat"
+]
+ORDER_TYPES = {
+    "order_id": pa.string(),
+    "start_billing": pa.int64(),  # Unix epoch seconds
+    "end_billing": pa.int64(),
+    "pickup_lon": pa.float64(),
+    "pickup_lat": pa.float64(),
+    "dropoff_lon": pa.float64(),
+    "dropoff_lat": pa.float64(),
+}
+# Bump when ORDER_TYPES changes, so stale order sidecars are ignored
+ORDER_SIDECAR_VERSION = 1
 
 
 class Adapter:
     def __init__(self, root_path: str):
         self.root = Path(root_path).expanduser()
-        self.gps_df = self._load_gps()
-        self.orders_df = self._load_orders()
+        # The two files are independent and Arrow parses/reads without holding
+        # the GIL, so load them concurrently.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            gps_future = pool.submit(self._load_gps)
+            orders_future = pool.submit(self._load_orders)
+            self.gps_df = gps_future.result()
+            self.orders_df = orders_future.result()
 
     def _load_gps(self) -> pd.DataFrame:
-        """Load raw GPS data"""
+        """Load the first GPS ping of every driver (streamed parse, Parquet sidecar afterwards)"""
         gps_path = self.root / "gps.txt"
         if not gps_path.exists() and (self.root / "gps").exists():
             gps_path = self.root / "gps"  # Fallback for no extension
-            
-        return pd.read_csv(
-            gps_path,
-            names=["driver_id", "order_id", "timestamp", "lon", "lat"]
+
+        return load_with_sidecar(
+            gps_path, _first_ping_per_driver, version=GPS_SIDECAR_VERSION, tag="drivers"
         )
 
     def _load_orders(self) -> pd.DataFrame:
-        """Load raw Orders data"""
+        """Load raw Orders data (Arrow parse on first run, Parquet sidecar afterwards)"""
         order_path = self.root / "order.txt"
         if not order_path.exists() and (self.root / "order").exists():
             order_path = self.root / "order" # Fallback for no extension
-            
-        return pd.read_csv(
+
+        return load_with_sidecar(
             order_path,
-            names=[
-                "order_id", "start_billing", "end_billing", 
-                "pickup_lon", "pickup_lat", "dropoff_lon", "dropoff_lat"
-            ]
+            lambda p: read_csv_arrow(p, ORDER_COLUMNS, ORDER_TYPES),
+            version=ORDER_SIDECAR_VERSION,
         )
 
     # ------------------------------------------------------------------ #
@@ -54,11 +95,8 @@ class Adapter:
         """
         
         # 1. FAST VECTORIZED WORKER EXTRACTION
-        # drop_duplicates is exponentially faster than groupby().first() on large DataFrames
-        first_gps = (
-            self.gps_df.drop_duplicates(subset=["driver_id"], keep="first")
-            [["driver_id", "timestamp", "lon", "lat"]]
-        )
+        # gps_df already holds one (first) ping per driver, see _first_ping_per_driver
+        first_gps = self.gps_df[GPS_KEEP_COLUMNS]
         
         workers_df = first_gps.rename(columns={
             "driver_id": "worker_id",
@@ -69,6 +107,9 @@ class Adapter:
         
         # Assuming an 8-hour shift (28,800 seconds) if deadline isn't natively in the GPS data
         workers_df['deadline'] = workers_df['release_time'] + 28800.0
+        # Simulator geometry runs in float64; widen once here, not per object
+        for col in ('start_lat', 'start_lon'):
+            workers_df[col] = workers_df[col].astype(np.float64)
 
         # 2. FAST VECTORIZED TASK EXTRACTION
         tasks_df = self.orders_df.rename(columns={
@@ -81,6 +122,14 @@ class Adapter:
             "end_billing": "expire_time" 
         }).copy()
 
+        # Raw ids are 32-char hashes used only as keys: swap them for int64 ranks
+        # (lexicographic, so id tie-break order is preserved) and keep the
+        # originals alongside for traceability.
+        workers_df["driver_id"] = workers_df["worker_id"].astype(str)
+        workers_df["worker_id"] = _lexicographic_codes(workers_df["driver_id"])
+        tasks_df["order_id"] = tasks_df["task_id"]
+        tasks_df["task_id"] = _lexicographic_codes(tasks_df["order_id"])
+
         # 3. STRICT FLOAT BOUNDARY
         # Ensure all timestamps are strict floats to power the DRL physics engine
         for col in ['release_time', 'deadline']:
@@ -91,4 +140,43 @@ class Adapter:
             if col in tasks_df.columns:
                 tasks_df[col] = tasks_df[col].astype(float)
 
-        return workers_df, tasks_df
\ No newline at end of file
+        return workers_df, tasks_df
+
+
+def _first_ping_per_driver(gps_path: Path) -> pa.Table:
+    """
+    Stream gps.txt batch by batch and keep only the first ping (in file order)
+    of each driver. Only the driver's spawn point is used downstream, so peak
+    memory is bounded by one batch plus one row per driver instead of the
+    whole trajectory log.
+    """
+    reader = pa_csv.open_csv(
+        gps_path,
+        read_options=pa_csv.ReadOptions(column_names=GPS_COLUMNS, block_size=GPS_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=GPS_TYPES, include_columns=GPS_KEEP_COLUMNS
+        ),
+    )
+
+    firsts = [_first_rows_per_driver(pa.Table.from_batches([batch])) for batch in reader]
+    if not firsts:
+        return reader.schema.empty_table()
+
+    # Zero-copy concat; unify the per-batch driver dictionaries so one set of
+    # int codes covers the whole table before the final cross-batch dedup.
+    combined = pa.concat_tables(firsts).unify_dictionaries().combine_chunks()
+    return _first_rows_per_driver(combined)
+
+
+def _first_rows_per_driver(table: pa.Table) -> pa.Table:
+    """Rows of *table* holding each driver's first occurrence, in original order."""
+    codes = table.column("driver_id").combine_chunks().indices.to_numpy(zero_copy_only=False)
+    _, first_idx = np.unique(codes, return_index=True)
+    first_idx.sort()
+    return table.take(first_idx)
+
+
+def _lexicographic_codes(ids: pd.Series) -> np.ndarray:
+    """int64 code per id such that code order matches string order."""
+    _, codes = np.unique(ids.to_numpy(dtype=str), return_inverse=True)
+    return codes.astype(np.int64)
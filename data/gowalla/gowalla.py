@@ -79,6 +79,9 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+from data.parquet_cache import cache_key, load_with_ipc_cache, load_with_sidecar, read_csv_arrow
 
 
 # ---------------------------------------------------------------------------
@@ -89,6 +92,21 @@ CITY_BBOXES: dict[str, tuple[float, float, float, float]] = {
     "san_francisco": (37.6,  37.9, -122.6, -122.3),
 }
 
+NS_PER_DAY = 86_400 * 10**9
+# Bump when the cached check-in frame's columns change, so stale IPC files are ignored
+CHECKINS_CACHE_VERSION = 2
+# Bump when CHECKIN_TYPES changes, so stale raw-parse sidecars are ignored
+CHECKINS_SIDECAR_VERSION = 1
+
+CHECKIN_COLUMNS = ["user_id", "checkin_time", "lat", "lon", "location_id"]
+CHECKIN_TYPES = {
+    "user_id": pa.int64(),
+    "checkin_time": pa.timestamp("ns", tz="UTC"),  # ISO-8601, e.g. 2010-10-19T23:55:27Z
+    "lat": pa.float64(),
+    "lon": pa.float64(),
+    "location_id": pa.int64(),
+}
+
 
 class Adapter:
     def __init__(
@@ -178,21 +196,37 @@ class Adapter:
                 f"Download from: https://snap.stanford.edu/data/loc-gowalla.html"
             )
 
-        df = pd.read_csv(
-            checkin_path,
-            sep="\t",
-            names=["user_id", "checkin_time", "lat", "lon", "location_id"],
-            compression="gzip",
+        # The filtered frame depends on the raw file and every filter parameter;
+        # warm runs with the same settings memory-map it from an Arrow IPC file.
+        key = cache_key(
+            checkin_path, self.bbox, self.date_start, self.date_end, self.compress_to_day,
+            CHECKINS_CACHE_VERSION,
+        )
+        return load_with_ipc_cache(
+            self.root / f".checkins-{key}.arrow",
+            lambda: self._build_checkins(checkin_path),
+        )
+
+    def _build_checkins(self, checkin_path: Path) -> pd.DataFrame:
+        """Parse, clean and filter the raw check-ins (cold path of _load_checkins)."""
+        # Parsed once with Arrow (gzip detected from the extension); later runs
+        # read loc-gowalla_totalCheckins.txt.parquet. Filters are applied below,
+        # so one sidecar serves every region / date window.
+        df = load_with_sidecar(
+            checkin_path, _parse_checkins, version=CHECKINS_SIDECAR_VERSION
         )
 
-        df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
-        df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
+        # lat/lon arrive as float64 and checkin_time as datetime64[ns, UTC] from
+        # _parse_checkins, with empty or malformed values as NaN/NaT, so no
+        # pd.to_numeric / pd.to_datetime coercion pass is needed.
         df = df.dropna(subset=["lat", "lon", "checkin_time"])
 
-        df["dt"] = pd.to_datetime(df["checkin_time"], utc=True, errors="coerce")
-        df = df.dropna(subset=["dt"])
-        df["timestamp"] = df["dt"].astype("int64") / 1e9
-        df["date"] = df["dt"].dt.date
+        df["dt"] = df["checkin_time"]
+        dt_ns = df["dt"].astype("int64")
+        df["timestamp"] = dt_ns / 1e9
+        # Calendar day as int64 days since the Unix epoch (UTC): same grouping
+        # and ordering as datetime.date, but hashes/sorts as a plain integer.
+        df["date"] = dt_ns // NS_PER_DAY
 
         # Bounding-box filter
         if self.bbox is not None:
@@ -237,13 +271,14 @@ class Adapter:
         worker (user, day) deduplication still produces one worker per user
         (all days collapse to the same reference date).
         """
-        ref_midnight_unix = float(
-            df["dt"].min().normalize().timestamp()
-        )
+        # Pure int64-nanosecond arithmetic: normalising a UTC timestamp is a
+        # floor to a multiple of one day.
+        dt_ns = df["dt"].astype("int64").to_numpy()
+        day_start_ns = dt_ns - dt_ns % NS_PER_DAY
+        ref_midnight_ns = int(day_start_ns.min())
+        ref_midnight_unix = ref_midnight_ns / 1e9
         # seconds since midnight of each check-in's own day
-        day_start_unix = (
-            df["dt"].dt.normalize().astype("int64") / 1e9
-        ).values
+        day_start_unix = day_start_ns / 1e9
         time_of_day_sec = df["timestamp"].values - day_start_unix
 
         df = df.copy()
@@ -254,7 +289,7 @@ class Adapter:
         # Without this, all days collapse to one reference date and the worker
         # pool shrinks to just unique users (~2.6k) instead of unique user-days
         # (~8.7k), breaking the intended workers_per_task_ratio.
-        df["dt"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+        df["dt"] = pd.to_datetime(ref_midnight_ns + (dt_ns - day_start_ns), utc=True)
         # df["date"] is intentionally NOT updated — original dates are preserved.
         return df
 
@@ -274,22 +309,29 @@ class Adapter:
 
     def _build_tasks_location_pair(self, df: pd.DataFrame) -> pd.DataFrame:
         """(location_id, day) pairs with >= 2 check-ins define one task."""
-        agg = (
-            df.groupby(["location_id", "date"])
-              .agg(
-                  release_time=("timestamp", "min"),
-                  expire_time=("timestamp",  "max"),
-                  pickup_lat=("lat",         "first"),
-                  pickup_lon=("lon",         "first"),
-                  n=("timestamp",            "count"),
-              )
-              .reset_index()
-        )
-        tasks = agg[agg["n"] >= 2].copy()
-        tasks = tasks[tasks["expire_time"] > tasks["release_time"]]
-        tasks = tasks.reset_index(drop=True)
-        tasks["task_id"] = tasks.index
-        return tasks[["task_id", "pickup_lat", "pickup_lon", "release_time", "expire_time"]]
+        # One stable lexsort puts each (location_id, day) group in a contiguous
+        # run (rows keep file order within a run), then every aggregate is a
+        # single reduceat over the run starts; no per-group Python work.
+        location = df["location_id"].to_numpy()
+        day = df["date"].to_numpy()
+        order = np.lexsort((day, location))
+        timestamp = df["timestamp"].to_numpy()[order]
+        starts = _run_starts(location[order], day[order])
+
+        release_time = np.minimum.reduceat(timestamp, starts)
+        expire_time = np.maximum.reduceat(timestamp, starts)
+        n = np.diff(starts, append=len(order))
+        first = order[starts]
+
+        keep = (n >= 2) & (expire_time > release_time)
+        first = first[keep]
+        return pd.DataFrame({
+            "task_id":      np.arange(len(first)),
+            "pickup_lat":   df["lat"].to_numpy()[first],
+            "pickup_lon":   df["lon"].to_numpy()[first],
+            "release_time": release_time[keep],
+            "expire_time":  expire_time[keep],
+        })
 
     # ------------------------------------------------------------------ #
     # Canonical DataFrame export
@@ -328,20 +370,28 @@ class Adapter:
         ]].copy()
 
         # ---- WORKERS: first check-in per (user, day) -----------------------
-        workers_raw = (
-            df.sort_values("timestamp")
-              .drop_duplicates(subset=["user_id", "date"], keep="first")
-              [["user_id", "lat", "lon", "timestamp"]]
-              .copy()
-        )
-        workers_raw = workers_raw.rename(columns={
-            "user_id":   "worker_id",
-            "lat":       "start_lat",
-            "lon":       "start_lon",
-            "timestamp": "release_time",
+        # timestamp has no NaN (dropped at load), so a bare NumPy argsort
+        # replaces sort_values; quicksort is what sort_values used, keeping tie
+        # order identical. A stable lexsort over that order then makes each
+        # (user, day) a contiguous run whose head is its earliest check-in, and
+        # the heads, put back in time order, are exactly what
+        # drop_duplicates(keep="first") kept -- without hashing every row.
+        order = np.argsort(df["timestamp"].to_numpy(), kind="quicksort")
+        user = df["user_id"].to_numpy()[order]
+        day = df["date"].to_numpy()[order]
+        by_user_day = np.lexsort((day, user))
+        heads = by_user_day[_run_starts(user[by_user_day], day[by_user_day])]
+        heads.sort()
+        rows = order[heads]
+
+        release_time = df["timestamp"].to_numpy()[rows]
+        workers_raw = pd.DataFrame({
+            "worker_id":    user[heads],
+            "start_lat":    df["lat"].to_numpy()[rows],
+            "start_lon":    df["lon"].to_numpy()[rows],
+            "release_time": release_time,
+            "deadline":     release_time + self.shift_hours * 3600.0,
         })
-        workers_raw["deadline"] = workers_raw["release_time"] + self.shift_hours * 3600.0
-        workers_raw = workers_raw.reset_index(drop=True)
 
         # Downsample workers to a sensible supply:demand ratio
         if self.workers_per_task_ratio is not None:
@@ -360,3 +410,44 @@ class Adapter:
             tasks_df[col] = tasks_df[col].astype(float)
 
         return workers_df, tasks_df
+
+
+def _run_starts(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Start index of every run of equal (a, b) pairs in two aligned, grouped arrays."""
+    new_group = np.empty(len(a), dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+    return np.flatnonzero(new_group)
+
+
+def _parse_checkins(path: Path) -> pa.Table:
+    """
+    Parse the raw check-in dump into CHECKIN_TYPES columns.
+
+    Clean files take the typed Arrow parse. If any value fails to convert (a
+    non-numeric coordinate, an unparseable timestamp), the file is re-read as
+    strings and coerced: bad coordinates and timestamps become null (dropped by
+    the caller's dropna), rows with a bad user_id or the wrong field count are
+    skipped. One bad line therefore costs a slower parse, not the whole load.
+    """
+    try:
+        return read_csv_arrow(path, CHECKIN_COLUMNS, CHECKIN_TYPES, delimiter="\t")
+    except pa.ArrowInvalid:
+        pass
+
+    raw = read_csv_arrow(
+        path, CHECKIN_COLUMNS, dict.fromkeys(CHECKIN_COLUMNS, pa.string()),
+        delimiter="\t", skip_invalid_rows=True,
+    ).to_pandas()
+    df = pd.DataFrame({
+        "user_id": pd.to_numeric(raw["user_id"], errors="coerce"),
+        "checkin_time": pd.to_datetime(raw["checkin_time"], utc=True, errors="coerce"),
+        "lat": pd.to_numeric(raw["lat"], errors="coerce"),
+        "lon": pd.to_numeric(raw["lon"], errors="coerce"),
+        "location_id": pd.to_numeric(raw["location_id"], errors="coerce"),
+    })
+    # Workers are keyed by user, so a row without a valid user id is unusable
+    df = df[df["user_id"].notna()]
+    return pa.Table.from_pandas(
+        df, schema=pa.schema(list(CHECKIN_TYPES.items())), preserve_index=False
+    )
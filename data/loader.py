@@ -17,17 +17,28 @@ from data.gowalla import gowalla
 from config import get_data_sampling_config
 from data.stratified_sampler import stratified_temporal_sample
 
+# Canonical numeric columns: declared up front so the CSV reader skips type inference
+WORKER_DTYPES = {col: "float64" for col in ("start_lat", "start_lon", "release_time", "deadline")}
+TASK_DTYPES = {
+    col: "float64"
+    for col in ("pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon", "release_time", "expire_time")
+}
+
+def _read_canonical_csv(file_path, dtypes):
+    """Read a canonical workers/tasks CSV with Arrow's multithreaded parser."""
+    return pd.read_csv(file_path, engine="pyarrow", dtype=dtypes)
+
 def load_workers(file_path):
     """Loads workers from a CSV/txt file and returns a list of Worker objects."""
-    df = pd.read_csv(file_path)
-    return [Worker(row) for row in df.to_dict('records')]
+    df = _read_canonical_csv(file_path, WORKER_DTYPES)
+    return Worker.from_arrays(**{col: df[col] for col in df.columns})
 
 def load_tasks(file_path):
     """Loads tasks from a CSV/txt file and returns a list of Task objects."""
-    df = pd.read_csv(file_path)
+    df = _read_canonical_csv(file_path, TASK_DTYPES)
     if not df.empty and 'pickup_lat' in df.columns:
         set_city_constants(float(df['pickup_lat'].mean()))
-    return [Task(row) for row in df.to_dict('records')]
+    return Task.from_arrays(**{col: df[col] for col in df.columns})
 
 # --------------------------------------------------------------------------- #
 # Unified Loader - The Bridge between Pandas DataFrames and the Simulation Engine
@@ -55,8 +66,8 @@ def load_workers_tasks(dataset: str, root_path: str | None = None, **adapter_kwa
                 f"workers.txt / tasks.txt not found in {root_path}."
             )
 
-        workers_df = pd.read_csv(workers_path)
-        tasks_df = pd.read_csv(tasks_path)
+        workers_df = _read_canonical_csv(workers_path, WORKER_DTYPES)
+        tasks_df = _read_canonical_csv(tasks_path, TASK_DTYPES)
 
     # --- FLAT EARTH SETUP ---
     mean_lats = []
@@ -70,10 +81,10 @@ def load_workers_tasks(dataset: str, root_path: str | None = None, **adapter_kwa
 
     # --- FAST VECTORIZED INSTANTIATION ---
     print(f"   📊 Instantiating {len(workers_df):,} Workers...")
-    workers = [Worker(row) for row in workers_df.to_dict('records')]
+    workers = Worker.from_arrays(**{col: workers_df[col] for col in workers_df.columns})
     
     print(f"   📊 Instantiating {len(tasks_df):,} Tasks...")
-    tasks = [Task(row) for row in tasks_df.to_dict('records')]
+    tasks = Task.from_arrays(**{col: tasks_df[col] for col in tasks_df.columns})
 
     # --- STRATIFIED SAMPLING INTERCEPT ---
     sampling_cfg = get_data_sampling_config()
@@ -94,14 +105,17 @@ def load_workers_tasks(dataset: str, root_path: str | None = None, **adapter_kwa
 
     return workers, tasks
 
+# Dataset name -> adapter factory. The DiDi adapter takes no extra options.
+ADAPTERS = {
+    "didi": lambda root_path, **_kwargs: didi.Adapter(root_path),
+    "nyc_taxi": nyc_taxi.Adapter,
+    "gowalla": gowalla.Adapter,
+}
+
 def get_adapter(dataset: str, root_path: str, **kwargs):
-    if dataset == "didi":
-        return didi.Adapter(root_path)
-    elif dataset == "nyc_taxi":
-        return nyc_taxi.Adapter(root_path, **kwargs)
-    elif dataset == "gowalla":
-        return gowalla.Adapter(root_path, **kwargs)
-    elif dataset == "synthetic":
-        raise NotImplementedError("Synthetic adapter not yet implemented.")
-    else:
+    factory = ADAPTERS.get(dataset)
+    if factory is None:
+        if dataset == "synthetic":
+            raise NotImplementedError("Synthetic adapter not yet implemented.")
         raise ValueError(f"Unknown dataset: {dataset}")
+    return factory(root_path, **kwargs)
@@ -41,7 +41,15 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# The only trip columns the simulator reads; everything else stays on disk
+TRIP_COLUMNS = [
+    "tpep_pickup_datetime", "tpep_dropoff_datetime", "PULocationID", "DOLocationID",
+]
 
 
 class Adapter:
@@ -89,10 +97,21 @@ class Adapter:
                 f"       python data/nyc_taxi/generate_zone_centroids.py\n"
             )
         df = pd.read_csv(csv_path)
-        return {
-            int(row["LocationID"]): (float(row["lat"]), float(row["lon"]))
-            for _, row in df.iterrows()
-        }
+        # Column-wise zip of plain Python scalars; no per-row Series boxing
+        return dict(zip(
+            df["LocationID"].astype("int64").tolist(),
+            zip(df["lat"].astype(float).tolist(), df["lon"].astype(float).tolist()),
+        ))
+
+    def _zone_lookup_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Dense LocationID-indexed (lat, lon) arrays; unknown zones are NaN."""
+        size = max(self._zone_centroids, default=-1) + 1
+        zone_lat = np.full(size, np.nan)
+        zone_lon = np.full(size, np.nan)
+        for zone_id, (lat, lon) in self._zone_centroids.items():
+            zone_lat[zone_id] = lat
+            zone_lon[zone_id] = lon
+        return zone_lat, zone_lon
 
     def _load_trips(self) -> pd.DataFrame:
         """Load the parquet file and apply date + validity filters."""
@@ -102,27 +121,49 @@ class Adapter:
                 f"No 'yellow_tripdata_*.parquet' files found in '{self.root}'."
             )
 
-        df = pd.read_parquet(parquet_files[0])
+        parquet_path = parquet_files[0]
+
+        # Push the single-day filter down into the Parquet scan when the pickup
+        # column is a naive timestamp (the TLC format): row groups outside the
+        # day are skipped and only the matching rows are materialised.
+        filters = None
+        if self.date is not None:
+            pickup_type = pq.read_schema(parquet_path).field("tpep_pickup_datetime").type
+            if pa.types.is_timestamp(pickup_type) and pickup_type.tz is None:
+                day_start = pd.Timestamp(self.date).normalize()
+                filters = [
+                    ("tpep_pickup_datetime", ">=", day_start),
+                    ("tpep_pickup_datetime", "<", day_start + pd.Timedelta(days=1)),
+                ]
+
+        df = pd.read_parquet(parquet_path, columns=TRIP_COLUMNS, filters=filters)
 
         # Ensure datetime columns are parsed
         for col in ("tpep_pickup_datetime", "tpep_dropoff_datetime"):
             if not pd.api.types.is_datetime64_any_dtype(df[col]):
                 df[col] = pd.to_datetime(df[col], errors="coerce")
 
-        # Filter to a single calendar day if requested
-        if self.date is not None:
-            target_date = pd.Timestamp(self.date).date()
-            mask = df["tpep_pickup_datetime"].dt.date == target_date
-            df = df[mask]
+        # Filter to a single calendar day if requested (and not pushed down)
+        if self.date is not None and filters is None:
+            # Half-open range on the int64 timestamps; .dt.date would build a
+            # Python date object per row. Aware columns compare on local wall
+            # time, which is the calendar day .dt.date would report.
+            pickup = df["tpep_pickup_datetime"]
+            if pickup.dt.tz is not None:
+                pickup = pickup.dt.tz_localize(None)
+            day_start = pd.Timestamp(self.date).normalize()
+            df = df[(pickup >= day_start) & (pickup < day_start + pd.Timedelta(days=1))]
 
         # Drop rows with null timestamps
         df = df.dropna(subset=["tpep_pickup_datetime", "tpep_dropoff_datetime"])
 
         # Drop rows whose zone IDs don't exist in the centroid lookup
-        valid_zones = set(self._zone_centroids.keys())
+        # (dense array probe instead of hashing every id against a Python set)
+        zone_lat, _ = self._zone_lookup_arrays()
+        known_zone = ~np.isnan(zone_lat)
         df = df[
-            df["PULocationID"].isin(valid_zones)
-            & df["DOLocationID"].isin(valid_zones)
+            _zone_in_lookup(df["PULocationID"], known_zone)
+            & _zone_in_lookup(df["DOLocationID"], known_zone)
         ]
 
         # Sanity: dropoff must be after pickup
@@ -152,10 +193,13 @@ class Adapter:
         df = self._trips_df.copy()
 
         # --- ZONE ID → COORDINATES (vectorised) ---
-        df["pickup_lat"]  = df["PULocationID"].map(lambda z: self._zone_centroids[z][0])
-        df["pickup_lon"]  = df["PULocationID"].map(lambda z: self._zone_centroids[z][1])
-        df["dropoff_lat"] = df["DOLocationID"].map(lambda z: self._zone_centroids[z][0])
-        df["dropoff_lon"] = df["DOLocationID"].map(lambda z: self._zone_centroids[z][1])
+        zone_lat, zone_lon = self._zone_lookup_arrays()
+        pu_zone = df["PULocationID"].to_numpy(dtype=np.int64)
+        do_zone = df["DOLocationID"].to_numpy(dtype=np.int64)
+        df["pickup_lat"]  = zone_lat[pu_zone]
+        df["pickup_lon"]  = zone_lon[pu_zone]
+        df["dropoff_lat"] = zone_lat[do_zone]
+        df["dropoff_lon"] = zone_lon[do_zone]
 
         # --- DATETIME → UNIX TIMESTAMP (seconds) ---
         df["release_time"] = df["tpep_pickup_datetime"].astype("int64") / 1e9
@@ -193,3 +237,13 @@ class Adapter:
             tasks_df[col] = tasks_df[col].astype(float)
 
         return workers_df, tasks_df
+
+
+def _zone_in_lookup(zone_ids: pd.Series, known_zone: np.ndarray) -> np.ndarray:
+    """Boolean mask: zone id is a valid index into *known_zone* and marked known."""
+    ids = zone_ids.to_numpy(dtype=np.float64, na_value=np.nan)
+    # NaN and out-of-range ids fail the bounds test; whole numbers only
+    in_range = (ids >= 0) & (ids < len(known_zone)) & (ids == np.floor(ids))
+    mask = np.zeros(len(ids), dtype=bool)
+    mask[in_range] = known_zone[ids[in_range].astype(np.int64)]
+    return mask
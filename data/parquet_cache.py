@@ -0,0 +1,140 @@
+"""
+Parquet sidecar cache for raw dataset files.
+
+The DiDi and Gowalla adapters read multi-GB text dumps. Parsing them with the
+pandas CSV tokenizer on every run dominates startup, so each raw file is parsed
+once with Arrow's multithreaded CSV reader (explicit column types, no inference)
+and persisted as a zstd-compressed Parquet sidecar next to the source:
+
+    gps.txt    ->  gps.drivers.sidecar-v1.parquet
+    order.txt  ->  order.sidecar-v1.parquet
+
+A sidecar is reused only while it is at least as new as the raw file, so
+re-extracting a day folder transparently invalidates the cache. The name also
+carries the adapter's schema version: bumping it when the parsed column types
+change makes old sidecars unreachable instead of silently reused.
+
+Fully filtered frames (which also depend on adapter parameters) can be kept
+in an Arrow IPC file named by ``cache_key``; warm runs memory-map it instead
+of re-running the filter pipeline.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+
+_KEY_HEAD_BYTES = 4096
+
+
+def sidecar_path(raw_path: Path, version: int, tag: str = "") -> Path:
+    """Parquet sidecar location for *raw_path* (e.g. order.txt -> order.sidecar-v1.parquet)."""
+    stem = f".{tag}" if tag else ""
+    return raw_path.with_suffix(f"{stem}.sidecar-v{version}.parquet")
+
+
+def is_fresh(raw_path: Path, sidecar: Path) -> bool:
+    """True if *sidecar* exists and is not older than *raw_path*."""
+    return sidecar.exists() and sidecar.stat().st_mtime_ns >= raw_path.stat().st_mtime_ns
+
+
+def read_csv_arrow(
+    path: Path,
+    column_names: list[str],
+    column_types: dict[str, pa.DataType],
+    delimiter: str = ",",
+    skip_invalid_rows: bool = False,
+) -> pa.Table:
+    """
+    Parse a header-less delimited file with a fixed schema (gzip detected by extension).
+
+    Values that do not convert to their column type raise ``pa.ArrowInvalid``.
+    With *skip_invalid_rows*, rows with the wrong number of fields are dropped
+    instead of raising.
+    """
+    return pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(column_names=column_names),
+        parse_options=pa_csv.ParseOptions(
+            delimiter=delimiter,
+            invalid_row_handler=(lambda _row: "skip") if skip_invalid_rows else None,
+        ),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+
+
+def load_with_sidecar(
+    raw_path: Path,
+    parse: Callable[[Path], pa.Table],
+    *,
+    version: int,
+    tag: str = "",
+) -> pd.DataFrame:
+    """
+    Return the parsed contents of *raw_path* as a DataFrame, via the Parquet sidecar
+    when it is fresh. Otherwise call *parse(raw_path)* and persist the result.
+    *version* identifies the schema *parse* produces and is part of the sidecar name.
+
+    The sidecar is written to a temporary file and atomically renamed, so an
+    interrupted run never leaves a truncated cache behind. Read-only data
+    directories still work; they simply never get a warm cache.
+    """
+    sidecar = sidecar_path(raw_path, version, tag)
+    if is_fresh(raw_path, sidecar):
+        return pq.read_table(sidecar).to_pandas()
+
+    table = parse(raw_path)
+
+    tmp_path = sidecar.with_name(sidecar.name + ".tmp")
+    try:
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+    return table.to_pandas()
+
+
+def cache_key(raw_path: Path, *params) -> str:
+    """
+    Short hash identifying *raw_path*'s contents (head bytes, size, mtime) and
+    the parameters that shaped the derived data.
+    """
+    st = raw_path.stat()
+    h = hashlib.blake2b(digest_size=8)
+    with open(raw_path, "rb") as f:
+        h.update(f.read(_KEY_HEAD_BYTES))
+    h.update(f"{st.st_size}:{st.st_mtime_ns}:{params!r}".encode())
+    return h.hexdigest()
+
+
+def load_with_ipc_cache(cache_path: Path, build: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Return the frame stored at *cache_path* (memory-mapped Arrow IPC) or call
+    *build()* and persist its result there. The key is expected to be part of
+    the file name, so an existing file is always valid.
+    """
+    if cache_path.exists():
+        with pa.memory_map(str(cache_path)) as source:
+            return pa_ipc.open_file(source).read_all().to_pandas()
+
+    df = build()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with pa_ipc.new_file(str(tmp_path), table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+    return df
@@ -10,11 +10,12 @@ This addresses the temporal misalignment issue discovered in Experiment 011
 where early tasks had insufficient worker availability.
 """
 
-import bisect
 import random
 from typing import List, Tuple
 from datetime import datetime
 
+import numpy as np
+
 
 def stratified_temporal_sample(
     all_workers: List,
@@ -66,20 +67,23 @@ def stratified_temporal_sample(
     bin_duration = task_duration / num_bins
     total_raw_tasks = len(sorted_tasks)
 
-    # Pre-extract release times once for O(log N) bisect lookups
+    # Pre-extract release times once for O(log N) binary-search lookups
     task_times_list = task_times  # already a plain list of floats
 
+    # All bin edges resolved in one vectorized searchsorted per side
+    task_bin_starts = task_start + np.arange(num_bins) * bin_duration
+    task_bin_ends = task_bin_starts + bin_duration
+    task_times_arr = np.asarray(task_times_list, dtype=float)
+    task_lo = np.searchsorted(task_times_arr, task_bin_starts, side="left").tolist()
+    task_hi = np.searchsorted(task_times_arr, task_bin_ends, side="left").tolist()
+
     sampled_tasks = []
     task_bin_counts = []
 
     for i in range(num_bins):
-        bin_start = task_start + i * bin_duration
-        bin_end = bin_start + bin_duration
-
-        # Binary search instead of O(N) linear scan
-        lo = bisect.bisect_left(task_times_list, bin_start)
-        hi = bisect.bisect_left(task_times_list, bin_end)
-        bin_tasks = sorted_tasks[lo:hi]
+        bin_start = float(task_bin_starts[i])
+        bin_end = float(task_bin_ends[i])
+        bin_tasks = sorted_tasks[task_lo[i]:task_hi[i]]
 
         # Proportional: if this bin has 5% of day's tasks, it gets 5% of target_tasks
         bin_weight = len(bin_tasks) / total_raw_tasks if total_raw_tasks > 0 else 0
@@ -93,9 +97,7 @@ def stratified_temporal_sample(
 
     if len(sampled_tasks) < target_tasks:
         remaining = target_tasks - len(sampled_tasks)
-        last_bin_start = task_bin_counts[-1][0]
-        lo = bisect.bisect_left(task_times_list, last_bin_start)
-        last_bin_tasks = sorted_tasks[lo:]
+        last_bin_tasks = sorted_tasks[task_lo[-1]:]
         additional = random.sample(last_bin_tasks, min(remaining, len(last_bin_tasks)))
         sampled_tasks.extend(additional)
     
@@ -135,16 +137,26 @@ def stratified_temporal_sample(
     # print()
 
     # Build per-bin worker lists once (O(W × avg_bins_per_worker) instead of O(B×W))
-    bin_boundaries = [overlap_start + i * bin_duration for i in range(num_bins + 1)]
-    worker_bin_lists: list = [[] for _ in range(num_bins)]
-    for w in sorted_workers:
-        # Worker overlaps bin i iff w.release_time < bin_end AND w.deadline >= bin_start
-        first_bin = bisect.bisect_right(bin_boundaries, w.release_time) - 1
-        last_bin  = bisect.bisect_left(bin_boundaries, w.deadline) - 1
-        first_bin = max(0, first_bin)
-        last_bin  = min(num_bins - 1, last_bin)
-        for b in range(first_bin, last_bin + 1):
-            worker_bin_lists[b].append(w)
+    bin_boundaries = overlap_start + np.arange(num_bins + 1) * bin_duration
+    # Worker overlaps bin i iff w.release_time < bin_end AND w.deadline >= bin_start
+    worker_release = np.fromiter((w.release_time for w in sorted_workers), dtype=float, count=len(sorted_workers))
+    worker_deadline = np.fromiter((w.deadline for w in sorted_workers), dtype=float, count=len(sorted_workers))
+    first_bins = np.maximum(np.searchsorted(bin_boundaries, worker_release, side="right") - 1, 0)
+    last_bins = np.minimum(np.searchsorted(bin_boundaries, worker_deadline, side="left") - 1, num_bins - 1)
+
+    # Expand each worker into its (bin, worker) slots, then group by bin with a
+    # stable sort so each bin keeps workers in release order.
+    span = np.maximum(last_bins - first_bins + 1, 0)
+    slot_worker = np.repeat(np.arange(len(sorted_workers)), span)
+    slot_bin = np.repeat(first_bins, span) + (
+        np.arange(slot_worker.size) - np.repeat(np.cumsum(span) - span, span)
+    )
+    order = np.argsort(slot_bin, kind="stable")
+    bin_splits = np.searchsorted(slot_bin[order], np.arange(1, num_bins))
+    worker_bin_lists: list = [
+        [sorted_workers[j] for j in idx.tolist()]
+        for idx in np.split(slot_worker[order], bin_splits)
+    ]
 
     total_worker_slots = sum(len(bl) for bl in worker_bin_lists)
     
@@ -17,9 +17,9 @@ class DeferralTracker:
         self.total_deferral_time_sec = 0.0
 
         # Temporary tracking (cleaned up on assignment/expiry to prevent memory leaks)
-        self.active_deferred_tasks = {}  # task_id -> first_deferral_ts
+        self.active_deferred_tasks = {}  # task.id (as-is, no str()) -> first_deferral_ts
         
-    def record_deferral(self, task_id: str, timestamp: float, score: float, reason: str):
+    def record_deferral(self, task_id, timestamp: float, score: float, reason: str):
         """
         Record when a task is deferred.
         Note: score and reason are accepted for API compatibility but not stored 
@@ -31,14 +31,14 @@ class DeferralTracker:
             self.active_deferred_tasks[task_id] = timestamp
             self.tasks_deferred_at_least_once += 1
             
-    def record_assignment(self, task_id: str, timestamp: float, was_deferred: bool, deferral_count: int):
+    def record_assignment(self, task_id, timestamp: float, was_deferred: bool, deferral_count: int):
         """Record when a task is finally assigned (rescued from deferred queue)."""
         if task_id in self.active_deferred_tasks:
             first_def_ts = self.active_deferred_tasks.pop(task_id)
             self.tasks_assigned_after_deferral += 1
             self.total_deferral_time_sec += (timestamp - first_def_ts)
 
-    def record_expiry(self, task_id: str):
+    def record_expiry(self, task_id):
         """Record when a deferred task expires without being assigned."""
         if task_id in self.active_deferred_tasks:
             self.active_deferred_tasks.pop(task_id)
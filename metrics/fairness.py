@@ -9,34 +9,33 @@ Implements the metrics described in the research methodology:
 """
 
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple
 from models.worker import Worker
 
 
 def jains_fairness_index(task_counts: List[int]) -> float:
     """Calculate Jain's Fairness Index. Returns 0 (unfair) to 1.0 (fair)."""
-    if not task_counts:
+    # np.asarray: no copy when callers already pass a float64 array
+    x = np.asarray(task_counts, dtype=np.float64)
+    n = x.size
+    if n == 0:
         return 1.0
     
-    x = np.array(task_counts, dtype=float)
-    n = len(x)
-    
-    sum_x = np.sum(x)
+    sum_x = x.sum()
     if sum_x == 0:
         return 1.0  
     
-    denominator = n * np.sum(x ** 2)
-    return (sum_x ** 2) / denominator if denominator > 0 else 1.0
+    denominator = n * np.dot(x, x)
+    return float((sum_x * sum_x) / denominator) if denominator > 0 else 1.0
 
 
 def utility_difference(worker_utilities: List[float]) -> float:
     """Calculate Utility Difference (UD): Max count - Min count."""
-    if not worker_utilities or len(worker_utilities) <= 1:
+    utilities = np.asarray(worker_utilities, dtype=np.float64)
+    if utilities.size <= 1:
         return 0.0
     
-    utilities = np.array(worker_utilities)
-    return float(np.max(utilities) - np.min(utilities))
+    return float(utilities.max() - utilities.min())
 
 
 def fairness_loss(actual_assignments: List[int], ideal_assignments: List[int]) -> float:
@@ -133,30 +132,35 @@ class FairnessMetricsTracker:
         if not self.enable_diagnostics:
             return
 
-        from simulator.spatial_index import fast_manhattan_km
+        from simulator.spatial_index import fast_manhattan_km_array
         
         task_id = str(task.id)
         eligible_workers = []
         
-        for worker in available_workers:
-            distance = fast_manhattan_km(
-                worker.start_lat, worker.start_lon,
-                task.pickup_lat, task.pickup_lon
-            )
+        # One vectorised distance pass over all candidates; only the (few)
+        # reachable workers are visited in Python afterwards.
+        workers = list(available_workers)
+        n = len(workers)
+        distances = fast_manhattan_km_array(
+            task.pickup_lat, task.pickup_lon,
+            np.fromiter((w.start_lat for w in workers), dtype=np.float64, count=n),
+            np.fromiter((w.start_lon for w in workers), dtype=np.float64, count=n),
+        )
+        reachable = np.flatnonzero(distances <= self.reachable_distance_km)
+        
+        for i, distance in zip(reachable.tolist(), distances[reachable].tolist()):
+            worker_id = str(workers[i].id)
+            eligible_workers.append(worker_id)
+            
+            if worker_id not in self.worker_eligibility_stats:
+                self.worker_eligibility_stats[worker_id] = {
+                    'eligible_tasks': 0,
+                    'actual_tasks': 0,
+                    'total_eligible_distance': 0.0
+                }
             
-            if distance <= self.reachable_distance_km:
-                eligible_workers.append(str(worker.id))
-                
-                worker_id = str(worker.id)
-                if worker_id not in self.worker_eligibility_stats:
-                    self.worker_eligibility_stats[worker_id] = {
-                        'eligible_tasks': 0,
-                        'actual_tasks': 0,
-                        'total_eligible_distance': 0.0
-                    }
-                
-                self.worker_eligibility_stats[worker_id]['eligible_tasks'] += 1
-                self.worker_eligibility_stats[worker_id]['total_eligible_distance'] += distance
+            self.worker_eligibility_stats[worker_id]['eligible_tasks'] += 1
+            self.worker_eligibility_stats[worker_id]['total_eligible_distance'] += distance
         
         self.task_eligibility_log[task_id] = {
             'eligible_workers': eligible_workers,
@@ -243,11 +247,11 @@ def gini_coefficient(task_counts: List[int]) -> float:
     Calculate the Gini coefficient of a frequency distribution (e.g., worker task counts).
     Returns a value between 0.0 (perfect equality) and 1.0 (maximum inequality).
     """
-    x = np.array(task_counts, dtype=np.float64)
+    x = np.asarray(task_counts, dtype=np.float64)
     if x.size == 0 or np.sum(x) == 0:
         return 0.0
 
-    x = np.sort(x)
+    x = np.sort(x)  # returns a copy; the caller's buffer is left untouched
     n = x.size
     index = np.arange(1, n + 1)
 
@@ -5,8 +5,9 @@ Highly optimized to provide $O(1)$ step tracking for Deep Reinforcement Learning
 
 from __future__ import annotations
 
+from array import array
+from itertools import compress
 from typing import Dict, Any, Optional, List
-import pandas as pd
 import numpy as np
 import datetime  # Built-in for faster timestamp processing
 
@@ -70,7 +71,7 @@ class MetricsManager:
         
         # O(1) Step accumulators (reset every step)
         self.step_completed_tasks_count = 0  # Replaced list with simple integer
-        self.step_wait_times = []  
+        self.step_wait_times = array('d')
         self.step_travel_dist = 0.0  
         self.step_start_time = None  
         self.step_tasks_released = 0  
@@ -79,10 +80,12 @@ class MetricsManager:
         self.step_total_deferrals = 0
         
         # Global accumulators (persist across steps)
+        # Per-task float samples live in array('d') buffers: unboxed 8-byte
+        # doubles that NumPy reads through the buffer protocol without a copy.
         self.total_tasks_released = 0
         self._summary_minimal = {
-            'service_times': [],
-            'pickup_distances': [],
+            'service_times': array('d'),
+            'pickup_distances': array('d'),
             'expired_tasks': [],
         }
         self._completed_tasks = 0
@@ -90,9 +93,9 @@ class MetricsManager:
         self._empty_km = 0.0
         self._passenger_km = 0.0
         self._total_wait_min = 0.0
-        self._wait_times = []
+        self._wait_times = array('d')
         self._backlog_peak = 0
-        self._assignment_delays = []
+        self._assignment_delays = array('d')
         self._total_platform_revenue = 0.0
     
     # --- EVENT HANDLERS (Fast, O(1) updates) ---
@@ -146,7 +149,7 @@ class MetricsManager:
             was_deferred = hasattr(task, 'deferral_count') and task.deferral_count > 0
             deferral_count = getattr(task, 'deferral_count', 0)
             self.deferral_tracker.record_assignment(
-                task_id=str(task.id),
+                task_id=task.id,
                 timestamp=current_time,
                 was_deferred=was_deferred,
                 deferral_count=deferral_count
@@ -192,7 +195,7 @@ class MetricsManager:
 
         if self.deferral_tracker:
             self.deferral_tracker.record_deferral(
-                task_id=str(task.id),
+                task_id=task.id,
                 timestamp=current_time,
                 score=score,
                 reason=reason
@@ -204,31 +207,31 @@ class MetricsManager:
         if step_start_time:
             self.step_start_time = step_start_time
         
-        for w in state.all_workers_map.values():
-            if w.available:
-                # Cap at the worker's own shift deadline so idle time never
-                # exceeds shift length (prevents negative utilisation for
-                # deferral-heavy strategies whose simulation ends after some
-                # workers' shifts have already expired).
-                effective_time = min(current_time, w.deadline)
-                if w.last_state_ts is not None and w.last_state_ts < effective_time:
-                    time_delta = effective_time - w.last_state_ts
-                    if time_delta > 0:
-                        w.update_idle_time(time_delta)
-                        w.last_state_ts = effective_time
-                elif w.last_state_ts is None:
-                    w.last_state_ts = effective_time
-        
         workers = list(state.all_workers_map.values())
+        self._accrue_idle_time(workers, state.worker_available, state.worker_deadlines, current_time)
+
         self.fairness_tracker.update_worker_stats(workers)
 
+        # One read of each per-worker column for the whole snapshot: the online
+        # filter, fairness, idle stats and the tracker below all share them
+        n_workers = len(workers)
+        completed_counts = np.fromiter(
+            (w.completed_tasks for w in workers), dtype=np.float64, count=n_workers
+        )
+        idle_times = np.fromiter(
+            (w.total_idle_time for w in workers), dtype=np.float64, count=n_workers
+        )
+
         # Fairness only over workers who have been online (idle time accrued) or completed work.
         # Avoids inflating n with workers not yet on shift.
-        active_workers = [w for w in workers if w.total_idle_time > 0 or w.completed_tasks > 0]
-        if not active_workers:
+        online = (idle_times > 0) | (completed_counts > 0)
+        if online.any():
+            active_workers = list(compress(workers, online))
+            # Single float64 buffer reused by JFI, Gini and UD
+            task_counts = completed_counts[online]
+        else:
             active_workers = workers
-
-        task_counts = [w.completed_tasks for w in active_workers]
+            task_counts = completed_counts
         jfi = jains_fairness_index(task_counts)
         gini = gini_coefficient(task_counts)
         utility_diff = utility_difference(task_counts)
@@ -278,9 +281,9 @@ class MetricsManager:
             task_worker_ratio = 0.0
         
         if workers:
-            idle_times_min = [w.total_idle_time / 60.0 for w in workers]
-            mean_idle = float(np.mean(idle_times_min))
-            std_idle = float(np.std(idle_times_min)) if len(idle_times_min) > 1 else 0.0
+            idle_times_min = idle_times / 60.0
+            mean_idle = float(idle_times_min.mean())
+            std_idle = float(idle_times_min.std()) if len(idle_times_min) > 1 else 0.0
             cv_idle = std_idle / mean_idle if mean_idle > 0 else 0.0
         else:
             mean_idle = 0.0
@@ -314,17 +317,51 @@ class MetricsManager:
             'pct_deferrals_no_candidates': pct_no_candidates,
         }
         
-        self.metric_tracker.snapshot(state, current_time)
+        self.metric_tracker.snapshot(state, current_time, workers, completed_counts)
         
         # Reset step accumulators
         self.step_completed_tasks_count = 0
-        self.step_wait_times = []
+        self.step_wait_times = array('d')
         self.step_travel_dist = 0.0
         self.step_tasks_released = 0
         self.step_total_deferrals = 0
         self.step_deferrals_below_threshold = 0
         self.step_deferrals_no_candidates = 0
     
+    @staticmethod
+    def _accrue_idle_time(workers, available, deadlines, current_time):
+        """
+        Credit idle time since each available worker's last state change.
+
+        Deltas are computed for the whole fleet with array arithmetic
+        (*available* and *deadlines* are aligned with *workers*); only workers
+        that actually accrue are touched in Python.
+        """
+        n = len(workers)
+        if n == 0:
+            return
+        # None (never anchored) becomes NaN, which fails every comparison below
+        last_ts = np.fromiter(
+            (np.nan if w.last_state_ts is None else w.last_state_ts for w in workers),
+            dtype=np.float64, count=n,
+        )
+        # Cap at the worker's own shift deadline so idle time never
+        # exceeds shift length (prevents negative utilisation for
+        # deferral-heavy strategies whose simulation ends after some
+        # workers' shifts have already expired).
+        effective_time = np.minimum(current_time, deadlines)
+
+        accrue = np.flatnonzero(available & (last_ts < effective_time))
+        deltas = (effective_time[accrue] - last_ts[accrue]).tolist()
+        for i, time_delta, ts in zip(accrue.tolist(), deltas, effective_time[accrue].tolist()):
+            w = workers[i]
+            w.update_idle_time(time_delta)
+            w.last_state_ts = ts
+
+        unanchored = np.flatnonzero(available & np.isnan(last_ts))
+        for i, ts in zip(unanchored.tolist(), effective_time[unanchored].tolist()):
+            workers[i].last_state_ts = ts
+
     def get_recent_expirations(self, current_time, window_minutes=30) -> int:
         """Counts how many tasks expired in the trailing time window."""
         window_seconds = window_minutes * 60.0
@@ -404,7 +441,7 @@ class MetricsManager:
     def on_task_expired(self, task_id, current_time=0.0):
         self._summary_minimal['expired_tasks'].append((task_id, current_time))
         if self.deferral_tracker:
-            self.deferral_tracker.record_expiry(str(task_id))
+            self.deferral_tracker.record_expiry(task_id)
 
     @property
     def summary(self):
@@ -6,6 +6,7 @@ Optimized for DRL throughput by disabling heavy historical tracking by default.
 from __future__ import annotations
 
 import json
+from itertools import chain
 from pathlib import Path
 from typing import List, Dict, Any
 
@@ -23,8 +24,10 @@ class MetricTracker:
         self.enable_diagnostics = enable_diagnostics
         
         # Historical arrays (Only populated if diagnostics are enabled to save RAM)
-        self._records: List[Dict[str, Any]] = [] if enable_diagnostics else None
-        self._worker_fairness_history: Dict[str, List[Dict]] = {} if enable_diagnostics else None
+        # Tick history as one list per KPI column, not one dict per tick
+        self._records: Dict[str, List] = {} if enable_diagnostics else None
+        # Per-worker columns (time / ewma / completed), not one dict per row
+        self._worker_fairness_history: Dict[str, Dict[str, List]] = {} if enable_diagnostics else None
         
         # Aggregate samples (Safe to store: max size = total tasks, ~1-2MB RAM)
         self._wait_time_samples: List[float] = []  
@@ -35,24 +38,34 @@ class MetricTracker:
     # Public API
     # ------------------------------------------------------------------ #
 
-    def snapshot(self, state, now: float) -> Dict[str, Any]:
+    def snapshot(self, state, now: float, workers=None, task_counts=None) -> Dict[str, Any]:
         """
         Capture a snapshot of key metrics for the current timestep.
         Returns the data for RL observation. Only saves history if diagnostics=True.
+
+        Callers that already walked the fleet this tick may pass the worker list
+        (all_workers_map order) and its completed-task counts to skip a re-read.
         """
-        workers = list(state.all_workers_map.values())
-        task_counts = [w.completed_tasks for w in workers]
+        if workers is None:
+            workers = list(state.all_workers_map.values())
+        if task_counts is None:
+            # One float64 buffer shared by JFI and UD (no per-call list/array copies)
+            task_counts = np.fromiter(
+                (w.completed_tasks for w in workers), dtype=np.float64, count=len(workers)
+            )
         
         # FAST MATH: Uses numpy under the hood via fairness.py
         jfi = jains_fairness_index(task_counts)
         ud = utility_difference(task_counts)
         
-        active_workers = _get_active_worker_count(workers, now)
+        active_workers = state.active_worker_count(now)
         backlog = len(state.active_tasks) + len(state.deferred_tasks)
         avg_wait = _get_avg_wait(state.active_tasks, state.deferred_tasks, now)
         
-        ewma_values = [w.fairness_ewma for w in workers]
-        ewma_mean = float(np.mean(ewma_values)) if ewma_values else 0.0
+        ewma_values = np.fromiter(
+            (w.fairness_ewma for w in workers), dtype=np.float64, count=len(workers)
+        )
+        ewma_mean = float(ewma_values.mean()) if ewma_values.size else 0.0
 
         record = {
             "time": now,
@@ -67,15 +80,19 @@ class MetricTracker:
 
         # HEAVY TRACKING: Lock behind diagnostics flag
         if self.enable_diagnostics:
-            self._records.append(record)
+            records = self._records
+            if not records:
+                records.update((key, []) for key in record)
+            for key, value in record.items():
+                records[key].append(value)
+            history = self._worker_fairness_history
             for w in workers:
-                if w.id not in self._worker_fairness_history:
-                    self._worker_fairness_history[w.id] = []
-                self._worker_fairness_history[w.id].append({
-                    "time": now, 
-                    "ewma": w.fairness_ewma,
-                    "completed": w.completed_tasks
-                })
+                columns = history.get(w.id)
+                if columns is None:
+                    columns = history[w.id] = {"time": [], "ewma": [], "completed": []}
+                columns["time"].append(now)
+                columns["ewma"].append(w.fairness_ewma)
+                columns["completed"].append(w.completed_tasks)
 
         return record
 
@@ -93,12 +110,14 @@ class MetricTracker:
         if not self.enable_diagnostics:
             print("Warning: Diagnostics disabled. No historical records to export.")
             return pd.DataFrame()
+        # dict of columns -> DataFrame directly, same column order as the record
         return pd.DataFrame(self._records)
 
     def export_worker_fairness_history(self) -> Dict[str, pd.DataFrame]:
         if not self.enable_diagnostics:
             return {}
-        return {w_id: pd.DataFrame(history) for w_id, history in self._worker_fairness_history.items()}
+        # dict of columns -> DataFrame directly, no list-of-dicts type inference
+        return {w_id: pd.DataFrame(columns) for w_id, columns in self._worker_fairness_history.items()}
 
     def get_wait_time_distribution(self) -> pd.DataFrame:
         return pd.DataFrame({"wait_time_sec": self._wait_time_samples})
@@ -152,12 +171,12 @@ class MetricTracker:
 # --------------------------------------------------------------------------- #
 
 def _get_avg_wait(active_tasks: set, deferred_tasks: set, now: float) -> float:
-    """O(N) iteration, using pure python math. Fast enough for snapshots."""
-    total_wait = sum(now - t.release_time for t in active_tasks) + \
-                 sum(now - t.release_time for t in deferred_tasks)
+    """Mean backlog age: one attribute read per task, arithmetic in NumPy."""
     count = len(active_tasks) + len(deferred_tasks)
-    return total_wait / count if count > 0 else 0.0
-
-def _get_active_worker_count(workers: list, now: float) -> int:
-    # A worker is active if their shift has started and hasn't ended
-    return sum(1 for w in workers if w.release_time <= now <= w.deadline)
\ No newline at end of file
+    if count == 0:
+        return 0.0
+    release_times = np.fromiter(
+        (t.release_time for t in chain(active_tasks, deferred_tasks)),
+        dtype=np.float64, count=count,
+    )
+    return float((now - release_times).sum() / count)
\ No newline at end of file
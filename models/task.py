@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import math
 
+import numpy as np
+
 from config import get_platform_revenue_config
 from simulator.spatial_index import fast_manhattan_km
 
@@ -13,21 +15,76 @@ def core_movement_cost_km(pickup_lat, pickup_lon, dropoff_lat, dropoff_lon) -> f
 
 def platform_revenue_from_alpha(alpha_km: float, base_fare: float | None = None, per_km_rate: float | None = None) -> float:
     """Platform monetary value t_j.m = base_fare + per_km_rate × α."""
-    cfg = get_platform_revenue_config()
-    base = cfg["base_fare"] if base_fare is None else base_fare
-    rate = cfg["per_km_rate"] if per_km_rate is None else per_km_rate
-    return base + rate * alpha_km
+    if base_fare is None or per_km_rate is None:
+        cfg = get_platform_revenue_config()
+        base_fare = cfg["base_fare"] if base_fare is None else base_fare
+        per_km_rate = cfg["per_km_rate"] if per_km_rate is None else per_km_rate
+    return base_fare + per_km_rate * alpha_km
 
 
 class Task:
+    # Fixed attribute layout: no per-instance __dict__ across large task pools
+    __slots__ = (
+        "id", "pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon",
+        "release_time", "expire_time",
+        "assigned_worker", "assigned", "is_completed",
+        "finish_time", "start_time", "pickup_km", "drop_km", "deferral_count",
+        "core_movement_cost_km", "revenue", "trip_km",
+        "_opp_credited_workers",  # set lazily by MetricsManager (read via getattr default)
+    )
+
     def __init__(self, task_dict):
-        self.id = task_dict["task_id"]
-        self.pickup_lat = float(task_dict["pickup_lat"])
-        self.pickup_lon = float(task_dict["pickup_lon"])
-        self.dropoff_lat = float(task_dict["dropoff_lat"])
-        self.dropoff_lon = float(task_dict["dropoff_lon"])
-        self.release_time = float(task_dict["release_time"])
-        self.expire_time = float(task_dict["expire_time"])
+        self._init_fields(
+            task_dict["task_id"],
+            float(task_dict["pickup_lat"]),
+            float(task_dict["pickup_lon"]),
+            float(task_dict["dropoff_lat"]),
+            float(task_dict["dropoff_lon"]),
+            float(task_dict["release_time"]),
+            float(task_dict["expire_time"]),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, task_id, pickup_lat, pickup_lon, dropoff_lat, dropoff_lon,
+        release_time, expire_time, **_extra_columns,
+    ):
+        """Build tasks column-wise from equal-length arrays (e.g. DataFrame columns).
+
+        Columns are converted to plain Python values once per column instead of
+        building a dict per row. Extra columns are ignored. The fare model is
+        resolved once for the whole batch rather than per task.
+        """
+        fare = get_platform_revenue_config()
+        base_fare, per_km_rate = fare["base_fare"], fare["per_km_rate"]
+        new = cls.__new__
+        tasks = []
+        for row in zip(
+            np.asarray(task_id).tolist(),
+            np.asarray(pickup_lat, dtype=float).tolist(),
+            np.asarray(pickup_lon, dtype=float).tolist(),
+            np.asarray(dropoff_lat, dtype=float).tolist(),
+            np.asarray(dropoff_lon, dtype=float).tolist(),
+            np.asarray(release_time, dtype=float).tolist(),
+            np.asarray(expire_time, dtype=float).tolist(),
+        ):
+            task = new(cls)
+            task._init_fields(*row, base_fare=base_fare, per_km_rate=per_km_rate)
+            tasks.append(task)
+        return tasks
+
+    def _init_fields(
+        self, task_id, pickup_lat: float, pickup_lon: float, dropoff_lat: float,
+        dropoff_lon: float, release_time: float, expire_time: float,
+        base_fare: float | None = None, per_km_rate: float | None = None,
+    ):
+        self.id = task_id
+        self.pickup_lat = pickup_lat
+        self.pickup_lon = pickup_lon
+        self.dropoff_lat = dropoff_lat
+        self.dropoff_lon = dropoff_lon
+        self.release_time = release_time
+        self.expire_time = expire_time
         self.assigned_worker = None
         self.assigned = False
         self.is_completed = False
@@ -46,7 +103,10 @@ class Task:
         self.core_movement_cost_km = core_movement_cost_km(
             self.pickup_lat, self.pickup_lon, self.dropoff_lat, self.dropoff_lon
         )
-        self.revenue = platform_revenue_from_alpha(self.core_movement_cost_km)
+        self.revenue = platform_revenue_from_alpha(self.core_movement_cost_km, base_fare, per_km_rate)
+        # Pickup→dropoff km under the *current* city constants; the simulator
+        # refreshes it on reset() so strategies need not recompute it per candidate
+        self.trip_km = self.core_movement_cost_km
 
     @property
     def base_utility(self):
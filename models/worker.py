@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
-import pandas as pd
+import numpy as np
 
 
 class Worker:
@@ -11,13 +10,51 @@ class Worker:
     EWMA fairness, revenue distribution, etc.
     """
 
+    # Fixed attribute layout: no per-instance __dict__ across large fleets
+    __slots__ = (
+        "id", "start_lat", "start_lon", "release_time", "deadline",
+        "assigned_task", "available",
+        "total_idle_time", "last_state_ts", "fairness_ewma", "last_active_ts", "fairness_anchor_ts",
+        "completed_tasks", "total_earnings", "opportunity_revenue",
+    )
+
     def __init__(self, worker_dict):
+        self._init_fields(
+            worker_dict["worker_id"],
+            float(worker_dict["start_lat"]),
+            float(worker_dict["start_lon"]),
+            float(worker_dict["release_time"]),
+            float(worker_dict["deadline"]),
+        )
+
+    @classmethod
+    def from_arrays(cls, worker_id, start_lat, start_lon, release_time, deadline, **_extra_columns):
+        """Build workers column-wise from equal-length arrays (e.g. DataFrame columns).
+
+        Columns are converted to plain Python values once per column instead of
+        building a dict per row. Extra columns are ignored.
+        """
+        new = cls.__new__
+        workers = []
+        for row in zip(
+            np.asarray(worker_id).tolist(),
+            np.asarray(start_lat, dtype=float).tolist(),
+            np.asarray(start_lon, dtype=float).tolist(),
+            np.asarray(release_time, dtype=float).tolist(),
+            np.asarray(deadline, dtype=float).tolist(),
+        ):
+            worker = new(cls)
+            worker._init_fields(*row)
+            workers.append(worker)
+        return workers
+
+    def _init_fields(self, worker_id, start_lat: float, start_lon: float, release_time: float, deadline: float):
         # Static attributes (from dataset)
-        self.id = worker_dict["worker_id"]
-        self.start_lat = float(worker_dict["start_lat"])
-        self.start_lon = float(worker_dict["start_lon"])
-        self.release_time = float(worker_dict["release_time"])
-        self.deadline = float(worker_dict["deadline"])
+        self.id = worker_id
+        self.start_lat = start_lat
+        self.start_lon = start_lon
+        self.release_time = release_time
+        self.deadline = deadline
 
         self.assigned_task = None     # Core link between worker and task; used to determine current busy state.
         self.available = True         # Fast boolean lookup; works with release_time and deadline in is_available().
@@ -26,6 +63,7 @@ class Worker:
         self.last_state_ts = self.release_time  # The "lap button"; used to calculate idle deltas between RL steps.
         self.fairness_ewma = 0.0      # Persists the decaying fairness score between assignments.
         self.last_active_ts = None    # The "Fairness Anchor"; records last completion to calculate wait time for next assignment.
+        self.fairness_anchor_ts = self.release_time  # last_active_ts, or release_time before any completion; read per scored candidate.
 
         self.completed_tasks = 0      # Used for JFI stats and as a physical constraint/cap in FATP-ANN strategy.
         self.total_earnings = 0.0     # Sum of task.revenue for completed tasks (platform revenue earned).
@@ -40,12 +78,13 @@ class Worker:
         """Update counters when a task is completed.
         
         Args:
-            now: Current time (pd.Timestamp or float Unix timestamp)
+            now: Current time (float Unix timestamp)
             task_revenue: Revenue from completed task
         """
         self.completed_tasks += 1
         self.total_earnings += float(task_revenue)
         self.last_active_ts = now
+        self.fairness_anchor_ts = now
         
         # Update last_state_ts for idle time tracking
         self.last_state_ts = now
@@ -1,25 +1,13 @@
-"""
-Event-driven Spatial Crowdsourcing simulator.
-"""
-import numpy as np
-from heapq import heappush, heappop
-import copy
-
-from typing import Dict, Optional
-from config import get_simulation_config
-from simulator.state import StateManager
-from simulator.strategies import get_strategy
-from metrics.manager import MetricsManager
-from simulator.spatial_index import set_city_constants
-from simulator.behavior import seed_acceptance_rng
-
 """
 Event-driven Spatial Crowdsourcing simulator.
 Highly optimized for Deep Reinforcement Learning (DRL) throughput.
 """
 
 import copy
-from heapq import heappush, heappop
+import random
+from heapq import heapify, heappush, heappop, merge
+from itertools import chain
+from operator import attrgetter
 from typing import Dict, Optional
 
 import numpy as np
@@ -28,9 +16,17 @@ from config import get_simulation_config
 from simulator.state import StateManager
 from simulator.strategies import get_strategy
 from metrics.manager import MetricsManager
-from simulator.spatial_index import set_city_constants
+from simulator.spatial_index import fast_manhattan_km, set_city_constants
 from simulator.behavior import seed_acceptance_rng
 
+# Event type codes for (time, type, id) heap entries. Small ints compare faster
+# than strings on time ties; the numbering keeps the old alphabetical tie order.
+REVIEW_BATCH = 0
+TASK_COMPLETE = 1
+TASK_EXPIRE = 2
+TASK_RELEASE = 3
+WORKER_RELEASE = 4
+
 class EventSimulator:
     """
     Event-driven simulator that supports step-based execution for RL control.
@@ -45,6 +41,25 @@ class EventSimulator:
             return result
         return [result]
     
+    def _commit_assignments(self, result):
+        """Record a strategy's assignments and queue their completions as one batch."""
+        completions = []
+        for assigned_task, assigned_worker, _ in self._coerce_assignments(result):
+            self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
+            completions.append((assigned_task.finish_time, TASK_COMPLETE, assigned_task.id))
+            heappush(self._completion_times, assigned_task.finish_time)
+
+        queue = self.event_queue
+        # Large batches (review epochs) are cheaper to merge with one O(n + k)
+        # heapify than k O(log n) pushes; entries are unique tuples, so pop
+        # order is the same either way.
+        if len(completions) * max(1, len(queue).bit_length()) > len(queue):
+            queue.extend(completions)
+            heapify(queue)
+        else:
+            for completion in completions:
+                heappush(queue, completion)
+
     def __init__(self, workers, tasks, sim_config: Optional[Dict] = None):
         self.initial_workers = workers
         self.initial_tasks = tasks
@@ -57,6 +72,10 @@ class EventSimulator:
         
         self.state = None
         self.event_queue = []
+        self._arrivals = iter(())
+        self._next_arrival_time = None
+        # Finish times of queued TASK_COMPLETE events, mirrored as a min-heap
+        self._completion_times = []
         self.current_time = None
         self.end_time = None
         
@@ -69,17 +88,17 @@ class EventSimulator:
         # (TASK_RELEASE, TASK_EXPIRE, TASK_COMPLETE, FREE_WORKER, plus margin).
         self.max_events = len(tasks) * 10
         if self.review_batch_handler is not None:
-            review_period = float(self.strategy_params.get("review_period_seconds", 60.0))
             horizon = 0.0
             if tasks:
                 horizon = max(t.expire_time for t in tasks)
             if workers:
                 horizon = max(horizon, max(w.deadline for w in workers))
+            # Streamed min over both pools; no concatenated list of every release time
             start = min(
-                [t.release_time for t in tasks] + [w.release_time for w in workers],
+                chain((t.release_time for t in tasks), (w.release_time for w in workers)),
                 default=0.0,
             )
-            review_epochs = int(max(0.0, horizon - start) / max(review_period, 1.0)) + 1
+            review_epochs = int(max(0.0, horizon - start) / max(self._review_period, 1.0)) + 1
             # Batch-review strategies accumulate far more events than other strategies:
             # every arriving task is deferred (TASK_EXPIRE), assigned at a review epoch
             # (TASK_COMPLETE + FREE_WORKER), and may sit in the deferred pool across
@@ -103,6 +122,8 @@ class EventSimulator:
         self.new_task_handler = strategy_handlers["NEW_TASK"]
         self.free_worker_handler = strategy_handlers["FREE_WORKER"]
         self.review_batch_handler = strategy_handlers.get("REVIEW_BATCH")
+        # Resolved once per strategy binding; read on every REVIEW_BATCH event
+        self._review_period = float(self.strategy_params.get("review_period_seconds", 60.0))
         self._always_invoke_new_task_handler = (
             self.review_batch_handler is not None
             or self.strategy_name in ("onrta_op", "onrta_rt", "biranking")
@@ -122,7 +143,7 @@ class EventSimulator:
 
         review_at = self.current_time + review_period_seconds
         self._next_review_time = review_at
-        heappush(self.event_queue, (review_at, "REVIEW_BATCH", 0))
+        heappush(self.event_queue, (review_at, REVIEW_BATCH, 0))
 
     def _maybe_schedule_review(self, review_period_seconds: float):
         """Arrivals kick off the review chain only when none is pending."""
@@ -141,11 +162,13 @@ class EventSimulator:
         if self.state.deferred_tasks or self.state.active_tasks:
             return self.current_time
 
-        next_time = None
-        for event_time, event_type, _ in self.event_queue:
-            if event_type in ("TASK_RELEASE", "WORKER_RELEASE", "TASK_COMPLETE"):
-                if next_time is None or event_time < next_time:
-                    next_time = event_time
+        # Arrivals come off a time-ordered cursor and completions are mirrored
+        # in their own heap, so neither needs a scan of the event queue.
+        next_time = self._next_arrival_time
+        if self._completion_times:
+            next_completion = self._completion_times[0]
+            if next_time is None or next_completion < next_time:
+                next_time = next_completion
         return next_time
 
     def _should_schedule_review(self, review_period_seconds: float) -> bool:
@@ -161,7 +184,33 @@ class EventSimulator:
     def _schedule_task_expiry(self, task):
         """O(1) Callback provided to strategies to schedule expirations."""
         if self.current_time < task.expire_time:
-            heappush(self.event_queue, (task.expire_time, "TASK_EXPIRE", task.id))
+            heappush(self.event_queue, (task.expire_time, TASK_EXPIRE, task.id))
+
+    @staticmethod
+    def _arrival_stream(workers, tasks):
+        """Lazily merged WORKER_RELEASE / TASK_RELEASE entries in heap order.
+
+        Each side is sorted by (release_time, id), which matches tuple order
+        within a single event type, so heapq.merge yields exactly the order
+        a fully populated heap would pop them in.
+        """
+        by_release = attrgetter("release_time", "id")
+        worker_events = (
+            (w.release_time, WORKER_RELEASE, w.id) for w in sorted(workers, key=by_release)
+        )
+        task_events = (
+            (t.release_time, TASK_RELEASE, t.id) for t in sorted(tasks, key=by_release)
+        )
+        return merge(worker_events, task_events)
+
+    def _push_next_arrival(self):
+        """Keep the earliest pending arrival in the heap (invariant for pop order)."""
+        arrival = next(self._arrivals, None)
+        if arrival is None:
+            self._next_arrival_time = None
+        else:
+            self._next_arrival_time = arrival[0]
+            heappush(self.event_queue, arrival)
 
     def reset(self, start_time=None, end_time=None):
         """Resets the simulation to the initial zero-state."""
@@ -174,15 +223,22 @@ class EventSimulator:
         if total_items > 0:
             total_lat = sum(w.start_lat for w in current_workers) + sum(t.pickup_lat for t in current_tasks)
             set_city_constants(total_lat / total_items)
+        # Per-run trip length under the constants just set (not the loader's)
+        for task in current_tasks:
+            task.trip_km = fast_manhattan_km(
+                task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon
+            )
         
         # Reset dynamic tracking variables
         for worker in current_workers:
             worker.total_idle_time = 0.0
             worker.last_state_ts = worker.release_time
             worker.last_active_ts = None
+            worker.fairness_anchor_ts = worker.release_time
         
         self.state = StateManager(current_workers, current_tasks)
         self.event_queue = []
+        self._completion_times = []
         self.metrics = MetricsManager({'strategy_params': self.strategy_params})
 
         acceptance_cfg = self.strategy_params.get("worker_acceptance", {})
@@ -210,6 +266,12 @@ class EventSimulator:
         if self.strategy_name == "biranking":
             self.strategy_params["rank_tracker"] = {}
 
+        if self.strategy_name == "random_assign":
+            # Dedicated per-run stream: reproducible, independent of global random
+            self.strategy_params["random_assign_rng"] = random.Random(
+                self.strategy_params.get("seed", 42)
+            )
+
         if start_time is None:
             # Generator expression for O(1) memory footprint
             releases = (obj.release_time for seq in (current_workers, current_tasks) for obj in seq)
@@ -224,15 +286,13 @@ class EventSimulator:
         self.step_start_time = None
         self._next_review_time = None
         
-        # Populate initial arrival events
-        for w in current_workers:
-            heappush(self.event_queue, (w.release_time, "WORKER_RELEASE", w.id))
-        for t in current_tasks:
-            heappush(self.event_queue, (t.release_time, "TASK_RELEASE", t.id))
+        # Arrivals are streamed: only the next pending release sits in the heap,
+        # the rest are produced lazily in (time, type, id) order.
+        self._arrivals = self._arrival_stream(current_workers, current_tasks)
+        self._push_next_arrival()
 
         if self.review_batch_handler is not None:
-            review_period = float(self.strategy_params.get("review_period_seconds", 60.0))
-            self._schedule_review(review_period)
+            self._schedule_review(self._review_period)
         
         return self.get_state()
 
@@ -284,6 +344,11 @@ class EventSimulator:
                 return True
                 
             event_time, event_type, event_id = heappop(self.event_queue)
+            if event_type == TASK_RELEASE or event_type == WORKER_RELEASE:
+                self._push_next_arrival()
+            elif event_type == TASK_COMPLETE:
+                # Queue pops in time order, so this is the mirror heap's minimum
+                heappop(self._completion_times)
             
             if self.end_time and event_time > self.end_time:
                 return True
@@ -296,17 +361,15 @@ class EventSimulator:
         
         return True
 
-    def _process_event(self, event_type: str, event_id: int):
-        if event_type == "WORKER_RELEASE":
+    def _process_event(self, event_type: int, event_id: int):
+        if event_type == WORKER_RELEASE:
             worker = self.state.get_worker(event_id)
             self.state.release_worker(worker)
             
             assignment = self.free_worker_handler(self.state, self.current_time, worker, **self.strategy_params)
-            for assigned_task, assigned_worker, _ in self._coerce_assignments(assignment):
-                self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
-                heappush(self.event_queue, (assigned_task.finish_time, "TASK_COMPLETE", assigned_task.id))
+            self._commit_assignments(assignment)
 
-        elif event_type == "TASK_RELEASE":
+        elif event_type == TASK_RELEASE:
             task = self.state.get_task(event_id)
             self.state.release_task(task)
             self.metrics.on_task_released(
@@ -318,54 +381,46 @@ class EventSimulator:
                 assignments = self.new_task_handler(
                     self.state, self.current_time, [task], **self.strategy_params
                 )
-                for assigned_task, assigned_worker, _ in self._coerce_assignments(assignments):
-                    self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
-                    heappush(self.event_queue, (assigned_task.finish_time, "TASK_COMPLETE", assigned_task.id))
+                self._commit_assignments(assignments)
             elif self.state.available_workers:
                 assignments = self.new_task_handler(self.state, self.current_time, [task], **self.strategy_params)
-                for assigned_task, assigned_worker, _ in self._coerce_assignments(assignments):
-                    self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
-                    heappush(self.event_queue, (assigned_task.finish_time, "TASK_COMPLETE", assigned_task.id))
+                self._commit_assignments(assignments)
             else:
                 # Strategy agnostic deferral mechanism
                 if self.state.defer_task(task, self.current_time):
                     self._schedule_task_expiry(task)
                     self.metrics.on_task_deferred(task, 0.0, "no_candidates", self.current_time)
 
-        elif event_type == "TASK_COMPLETE":
+        elif event_type == TASK_COMPLETE:
             task = self.state.get_task(event_id)
             if not task.is_completed:
                 worker = task.assigned_worker
                 self.state.complete_task(task, worker, self.current_time)
                 
                 assignment = self.free_worker_handler(self.state, self.current_time, worker, **self.strategy_params)
-                for assigned_task, assigned_worker, _ in self._coerce_assignments(assignment):
-                    self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
-                    heappush(self.event_queue, (assigned_task.finish_time, "TASK_COMPLETE", assigned_task.id))
+                self._commit_assignments(assignment)
 
                 self.metrics.on_task_completed(task, worker, self.current_time)
 
-        elif event_type == "TASK_EXPIRE":
+        elif event_type == TASK_EXPIRE:
             task = self.state.get_task(event_id)
             if task:
                 self.state.remove_deferred_task(task)
-                is_assigned = task in self.state.assigned_tasks
                 
-                if not is_assigned and task not in self.state.completed_tasks and not task.is_completed:
+                # task.assigned is set on assignment and never cleared, so it
+                # covers both the assigned and the completed pools
+                if not task.assigned:
                     # UPDATED: Pass the current_time so we can track the 30-minute window
                     self.metrics.on_task_expired(task.id, self.current_time)
 
-        elif event_type == "REVIEW_BATCH":
+        elif event_type == REVIEW_BATCH:
             self._next_review_time = None
             assignments = self.review_batch_handler(
                 self.state, self.current_time, **self.strategy_params
             )
-            for assigned_task, assigned_worker, _ in self._coerce_assignments(assignments):
-                self.metrics.on_task_assigned(assigned_task, assigned_worker, self.current_time)
-                heappush(self.event_queue, (assigned_task.finish_time, "TASK_COMPLETE", assigned_task.id))
+            self._commit_assignments(assignments)
 
-            review_period = float(self.strategy_params.get("review_period_seconds", 60.0))
-            self._schedule_review(review_period)
+            self._schedule_review(self._review_period)
 
     def get_state(self):
         obs_data = self.metrics.get_observation_data(self.state, self.current_time)
@@ -380,7 +435,6 @@ class EventSimulator:
         completed = results.get('completed_tasks', 0)
 
         # Helpers for safe calculations
-        def safe_mean(arr): return float(np.mean(arr)) if arr else 0.0
         def safe_std(arr): return float(np.std(arr)) if arr else 0.0
         def safe_percentile(arr, p): return float(np.percentile(arr, p)) if arr else 0.0
         def safe_max(arr): return float(np.max(arr)) if arr else 0.0
@@ -395,8 +449,11 @@ class EventSimulator:
         results['p90_wait_time_minutes'] = safe_percentile(results.get('wait_times', []), 90)
         results['max_wait_time_minutes'] = safe_max(results.get('wait_times', []))
 
-        worker_idle_times = [w.total_idle_time / 60.0 for w in self.state.all_workers_map.values()]
-        results['mean_worker_idle_time_min'] = safe_mean(worker_idle_times)
+        all_workers = self.state.all_workers_map
+        worker_idle_times = np.fromiter(
+            (w.total_idle_time for w in all_workers.values()), dtype=np.float64, count=len(all_workers)
+        ) / 60.0
+        results['mean_worker_idle_time_min'] = float(worker_idle_times.mean()) if all_workers else 0.0
 
         total_offers = self.state.offers_made
         total_rejections = self.state.offers_rejected
@@ -441,10 +498,10 @@ class Simulation:
         
         # --- FAST VECTORIZED INSTANTIATION ---
         print(f"   📊 Instantiating {len(self.workers_df):,} Workers...")
-        workers = [Worker(row) for row in self.workers_df.to_dict('records')]
+        workers = Worker.from_arrays(**{col: self.workers_df[col] for col in self.workers_df.columns})
         
         print(f"   📊 Instantiating {len(self.tasks_df):,} Tasks...")
-        tasks = [Task(row) for row in self.tasks_df.to_dict('records')]
+        tasks = Task.from_arrays(**{col: self.tasks_df[col] for col in self.tasks_df.columns})
         
         print("🚀 Executing Event Loop...")
         results = run_simulation(workers, tasks, sim_config=self.config)
@@ -4,10 +4,12 @@ Implements Advanced Nearest Neighbor (ANN) approach from FATP paper.
 """
 
 import math
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 from collections import defaultdict
 import heapq
 
+import numpy as np
+
 # --- SPATIAL INDEXING CONSTANTS ---
 
 # Grid resolution for spatial hashing/binning (e.g., assigning workers to grid cells).
@@ -58,6 +60,53 @@ def fast_manhattan_km(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     
     return d_lat + d_lon
 
+def fast_manhattan_km_array(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Vectorised fast_manhattan_km from one point to many (same formula and
+    operation order, so results match the scalar version bit for bit).
+    
+    Args:
+        lat, lon: Coordinates of the reference point (e.g., task pickup), or
+                  arrays aligned with lats/lons for element-wise pairs.
+        lats, lons: float64 arrays of the other points (e.g., worker locations).
+        
+    Returns:
+        float64 array of Manhattan distances in kilometers.
+    """
+    assert KM_PER_DEG_LON is not None, "City constants must be set before calculation."
+
+    return np.abs(lats - lat) * KM_PER_DEG_LAT + np.abs(lons - lon) * KM_PER_DEG_LON
+
+def fast_manhattan_km_matrix(lats_a: np.ndarray, lons_a: np.ndarray,
+                             lats_b: np.ndarray, lons_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise fast_manhattan_km between two point sets by broadcasting
+    (bit-identical to the scalar version for every pair).
+    
+    Args:
+        lats_a, lons_a: float64 arrays of the row points (e.g., workers).
+        lats_b, lons_b: float64 arrays of the column points (e.g., task pickups).
+        
+    Returns:
+        float64 array of shape (len(lats_a), len(lats_b)), in kilometers.
+    """
+    assert KM_PER_DEG_LON is not None, "City constants must be set before calculation."
+
+    return (
+        np.abs(lats_a[:, None] - lats_b[None, :]) * KM_PER_DEG_LAT
+        + np.abs(lons_a[:, None] - lons_b[None, :]) * KM_PER_DEG_LON
+    )
+
+def attribute_column(objs, attr: str) -> np.ndarray:
+    """float64 array of one attribute across a list of workers or tasks (e.g., the
+    coordinate inputs of fast_manhattan_km_matrix)."""
+    return np.fromiter((getattr(o, attr) for o in objs), dtype=np.float64, count=len(objs))
+
+def max_pickup_km(limit_time: float, now: float, speed_kmh: float) -> float:
+    """Farthest pickup reachable at *speed_kmh* before *limit_time* (the max_km
+    bound for GridSpatialIndex.query_k_nearest)."""
+    return (limit_time - now) * speed_kmh / 3600
+
 class GridSpatialIndex:
     """
     Grid-based spatial index for efficient nearest neighbor search.
@@ -87,8 +136,9 @@ class GridSpatialIndex:
         self.lat_attr = lat_attr
         self.lon_attr = lon_attr
         self.resolution = resolution
-        # Map (grid_x, grid_y) -> set of (lat, lon, item) tuples
-        self.grid = defaultdict(set)
+        # Map (grid_x, grid_y) -> {item: (lat, lon)}, keyed by the item itself so
+        # removal is one hash of the object rather than of a (lat, lon, item) tuple
+        self.grid = defaultdict(dict)
         self.count = 0 # number of items in the index for validation
 
     def _get_cell_coords(self, lat, lon):
@@ -103,8 +153,7 @@ class GridSpatialIndex:
         lat = getattr(item, self.lat_attr)
         lon = getattr(item, self.lon_attr)
         cell = self._get_cell_coords(lat, lon)
-        # Store as tuple: (lat, lon, item_reference)
-        self.grid[cell].add((lat, lon, item))
+        self.grid[cell][item] = (lat, lon)
         self.count += 1
 
     def remove(self, item):
@@ -117,36 +166,54 @@ class GridSpatialIndex:
         lat = getattr(item, self.lat_attr)
         lon = getattr(item, self.lon_attr)
         cell = self._get_cell_coords(lat, lon)
-        # Recreate the tuple exactly as it was added for removal
-        target = (lat, lon, item)
-        if target in self.grid[cell]:
-            self.grid[cell].remove(target)
+        # .get, not [], so a miss does not leave an empty cell behind
+        items_in_cell = self.grid.get(cell)
+        if items_in_cell and items_in_cell.pop(item, None) is not None:
             self.count -= 1
             # Cleanup empty cells to save memory
-            if not self.grid[cell]:
+            if not items_in_cell:
                 del self.grid[cell]
 
-    def query_k_nearest(self, center_lat: float, center_lon: float, k: int = 15) -> List:
+    def query_k_nearest(self, center_lat: float, center_lon: float, k: int = 15,
+                        max_km: Optional[float] = None) -> List:
         """
         Find k nearest items to a specific coordinate.
         Spirals out from center location and terminates early using a spatial lower-bound check.
+
+        If max_km is given (e.g. the farthest pickup that is still feasible), the
+        spiral also stops at the first ring that cannot hold an item within that
+        distance. Items beyond max_km may then be missing from the result, but
+        every item within it keeps its rank.
         """
+        assert KM_PER_DEG_LON is not None, "City constants must be set before calculation."
         center_cell = self._get_cell_coords(center_lat, center_lon)
         candidates = []
+        grid = self.grid
+        # fast_manhattan_km inlined (same operation order) with the scale
+        # factors bound locally: this loop runs once per indexed item scanned.
+        km_lat, km_lon = KM_PER_DEG_LAT, KM_PER_DEG_LON
+        # Any item in ring r is at least (r - 1) whole cells away along one axis.
+        # Use the narrower axis, plus a little slack so callers' float rounding
+        # at the boundary never loses an item they would accept.
+        ring_gap_km = self.resolution * min(km_lat, km_lon)
+        reach_km = None if max_km is None else max_km + 1e-6
         
         radius = 0
         # Sanity limit: 50 cells ≈ 50km. Prevents infinite loops if < k items exist globally.
         max_radius = 50 
         
         while radius < max_radius:
+            if reach_km is not None and (radius - 1) * ring_gap_km > reach_km:
+                break
             cells_to_check = self._get_cells_in_ring(center_cell, radius)
             
             for cell in cells_to_check:
-                items_in_cell = self.grid.get(cell)
+                items_in_cell = grid.get(cell)
                 if items_in_cell:
-                    for i_lat, i_lon, item in items_in_cell:
-                        dist = fast_manhattan_km(center_lat, center_lon, i_lat, i_lon)
-                        candidates.append((dist, item))
+                    candidates.extend(
+                        (abs(center_lat - i_lat) * km_lat + abs(center_lon - i_lon) * km_lon, item)
+                        for item, (i_lat, i_lon) in items_in_cell.items()
+                    )
             
             # --- THE GRID EDGE OPTIMIZATION ---
             # We cannot terminate just because we found `k` items. If the center point is near 
@@ -1,3 +1,5 @@
+import numpy as np
+
 from simulator.spatial_index import GridSpatialIndex
 
 
@@ -14,6 +16,23 @@ class StateManager:
         """
         self.all_workers_map = {w.id: w for w in all_workers} if all_workers else {}
         self.all_tasks_map = {t.id: t for t in all_tasks} if all_tasks else {}
+
+        # Columnar copies of the static shift bounds (fixed for a worker's
+        # lifetime), aligned with all_workers_map order, so fleet-wide
+        # on-shift checks are one vectorised mask instead of an object loop.
+        n_workers = len(self.all_workers_map)
+        self.worker_release_times = np.fromiter(
+            (w.release_time for w in self.all_workers_map.values()), dtype=np.float64, count=n_workers
+        )
+        self.worker_deadlines = np.fromiter(
+            (w.deadline for w in self.all_workers_map.values()), dtype=np.float64, count=n_workers
+        )
+        # Mirror of Worker.available in the same order, kept in sync by
+        # assign_task / complete_task (the only places a worker's busy state flips)
+        self._worker_slot = {w_id: i for i, w_id in enumerate(self.all_workers_map)}
+        self.worker_available = np.fromiter(
+            (w.available for w in self.all_workers_map.values()), dtype=bool, count=n_workers
+        )
         
         # Dynamic pools - Using sets for O(1) operations
         self.available_workers = set()
@@ -34,6 +53,11 @@ class StateManager:
         # INDEX 2: Deferred Tasks (uses pickup_lat/lon)
         self.deferred_task_index = GridSpatialIndex(lat_attr='pickup_lat', lon_attr='pickup_lon')
 
+    def active_worker_count(self, now: float) -> int:
+        """Number of workers whose shift window contains *now*."""
+        on_shift = (self.worker_release_times <= now) & (now <= self.worker_deadlines)
+        return int(np.count_nonzero(on_shift))
+
     def get_worker(self, worker_id):
         return self.all_workers_map.get(worker_id)
 
@@ -53,6 +77,7 @@ class StateManager:
         
         self.available_workers.discard(worker)
         self.spatial_index.remove(worker)
+        self.worker_available[self._worker_slot[worker.id]] = False
         
         self.assigned_tasks.add(task)
         self.assigned_workers.add(worker)
@@ -89,6 +114,7 @@ class StateManager:
         task.is_completed = True
         self.completed_tasks.add(task)
         worker.record_completion(current_time, task.revenue)
+        self.worker_available[self._worker_slot[worker.id]] = True
 
         # Worker physically moves to the drop-off location
         worker.start_lat = task.dropoff_lat
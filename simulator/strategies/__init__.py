@@ -20,9 +20,6 @@ def register(name: str) -> Callable:
 
 def get_strategy(name: str) -> Callable:
     """Return the registered assignment callable for the given strategy name."""
-    if not _STRATEGIES:  # Lazy-import bundled strategies on first call
-        _auto_import_builtins()
-
     if name not in _STRATEGIES:
         raise ValueError(
             f"Unknown assignment strategy '{name}'. Available strategies: {list(_STRATEGIES.keys())}"
@@ -54,4 +51,11 @@ def _auto_import_builtins() -> None:
         # We explicitly DO NOT use a try/except block here. 
         # If a strategy file is missing or contains a broken import, the simulation 
         # MUST fail loudly to prevent running experiments with corrupted codebases.
-        import_module(f"{__name__}.{mod}")
\ No newline at end of file
+        import_module(f"{__name__}.{mod}")
+
+
+# Register the bundled strategies at package import (register() is defined
+# above, so their `from simulator.strategies import register` resolves).
+# get_strategy() is then a plain dict lookup, and an external @register that
+# runs before the first lookup no longer suppresses the builtins.
+_auto_import_builtins()
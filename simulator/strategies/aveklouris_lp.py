@@ -35,7 +35,7 @@ from typing import Any, List, Tuple
 
 import numpy as np
 
-from simulator.spatial_index import fast_manhattan_km
+from simulator.spatial_index import attribute_column, fast_manhattan_km, fast_manhattan_km_matrix
 from simulator.strategies import register
 
 AVG_SPEED_KMH = 30.0
@@ -67,23 +67,26 @@ def _commit_assignment(task, worker, now, drop_distance=None):
     return task
 
 
-def _pair_utility(worker, task, now: float, d_drop: float) -> float | None:
-    """Return v_jk matching value, or None if the impatient constraints bind.
+def _pair_utility_matrix(tasks, workers, now: float, d_drop: np.ndarray) -> np.ndarray:
+    """(n_tasks, n_workers) v_jk matching values; _INFEASIBLE_UTILITY where the
+    impatient constraints bind.
 
-    d_drop (task-only pickup->dropoff distance) is passed in by the caller, which
-    hoists it out of the O(|T|x|W|) inner loop to avoid recomputing it per worker.
+    d_drop holds the task-only pickup->dropoff distances, computed once per task
+    by the caller.
     """
-    d_pick = fast_manhattan_km(
-        worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
+    d_pick = fast_manhattan_km_matrix(
+        attribute_column(tasks, "pickup_lat"), attribute_column(tasks, "pickup_lon"),
+        attribute_column(workers, "start_lat"), attribute_column(workers, "start_lon"),
     )
 
     pickup_eta = now + (d_pick / AVG_SPEED_KMH) * 3600.0
-    finish_eta = now + ((d_pick + d_drop) / AVG_SPEED_KMH) * 3600.0
-
-    if pickup_eta > task.expire_time or finish_eta > worker.deadline:
-        return None
+    finish_eta = now + ((d_pick + d_drop[:, None]) / AVG_SPEED_KMH) * 3600.0
+    infeasible = (
+        (pickup_eta > attribute_column(tasks, "expire_time")[:, None])
+        | (finish_eta > attribute_column(workers, "deadline"))
+    )
 
-    return 1.0 / (1.0 + d_pick)
+    return np.where(infeasible, _INFEASIBLE_UTILITY, 1.0 / (1.0 + d_pick))
 
 
 def execute_discrete_review(state, now: float, **_) -> List[Tuple[Any, Any, float]]:
@@ -94,21 +97,13 @@ def execute_discrete_review(state, now: float, **_) -> List[Tuple[Any, Any, floa
     if not workers or not tasks:
         return []
 
-    utility = np.full((len(tasks), len(workers)), _INFEASIBLE_UTILITY, dtype=np.float64)
-
-    # Drop distance depends only on the task — compute once per task instead of
-    # once per (task, worker) pair in the inner loop.
+    # Drop distance depends only on the task — compute once per task, then
+    # score every (task, worker) pair in one broadcast pass.
     task_drops = [
         fast_manhattan_km(t.pickup_lat, t.pickup_lon, t.dropoff_lat, t.dropoff_lon)
         for t in tasks
     ]
-
-    for i, task in enumerate(tasks):
-        d_drop = task_drops[i]
-        for j, worker in enumerate(workers):
-            value = _pair_utility(worker, task, now, d_drop)
-            if value is not None:
-                utility[i, j] = value
+    utility = _pair_utility_matrix(tasks, workers, now, np.asarray(task_drops, dtype=np.float64))
 
     # Minimize negative utility to maximize total assignment value.
     from scipy.optimize import linear_sum_assignment
@@ -161,7 +156,7 @@ def assign_new_tasks_discrete_review(
             if expiry_scheduler:
                 expiry_scheduler(task)
             if deferral_tracker:
-                deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_candidates")
+                deferral_tracker.record_deferral(task.id, now, 0.0, "no_candidates")
 
     _schedule_review_if_needed(review_scheduler, review_period_seconds)
     return []
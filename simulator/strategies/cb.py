@@ -92,6 +92,9 @@ def _execute_batch_match(state, now: float, k: int = 10) -> List[Tuple[Any, Any,
         for worker in nearest_workers:
             if worker not in state.available_workers:
                 continue
+            # Shift already over: no task can finish by the deadline, so skip before scoring
+            if worker.deadline < now:
+                continue
             d_pick = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
@@ -129,7 +132,7 @@ def assign_new_tasks_cb(
             if expiry_scheduler:
                 expiry_scheduler(task)
             if deferral_tracker:
-                deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_candidates")
+                deferral_tracker.record_deferral(task.id, now, 0.0, "no_candidates")
 
     return _maybe_dispatch(state, now, alpha, k)
 
@@ -1,7 +1,7 @@
 from simulator.strategies import register
 from math import log
 from typing import Optional, Tuple, List, Dict, Any
-from simulator.spatial_index import fast_manhattan_km
+from simulator.spatial_index import fast_manhattan_km, max_pickup_km
 from simulator.behavior import evaluate_worker_acceptance
 
 AVG_SPEED_KMH = 30
@@ -14,7 +14,7 @@ def _defer_composite(state, task, now, kwargs):
             expiry_scheduler(task)
         deferral_tracker = kwargs.get("deferral_tracker")
         if deferral_tracker:
-            deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_candidates")
+            deferral_tracker.record_deferral(task.id, now, 0.0, "no_candidates")
 
 
 def _normalize_components(components: List[float]) -> List[float]:
@@ -56,53 +56,60 @@ def _find_best_assignment_for_task(
     gamma=0.3,
     *,
     spatial_index,
-) -> Tuple[Optional[object], float]:
+) -> Tuple[Optional[object], float, Optional[float]]:
     """OPTIMIZED: Advanced Nearest Neighbor (ANN) single-pass evaluation."""
-    nearest_workers = spatial_index.query_k_nearest(task.pickup_lat, task.pickup_lon, k)
+    nearest_workers = spatial_index.query_k_nearest(
+        task.pickup_lat, task.pickup_lon, k, max_km=max_pickup_km(task.expire_time, now, AVG_SPEED_KMH)
+    )
     if not nearest_workers:
-        return None, float("-inf")
+        return None, float("-inf"), None
 
     # CONSTANTS
-    drop_distance_const = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
+    drop_distance_const = task.trip_km
     starvation_raw = log(1 + (now - task.release_time))
     starvation_score = starvation_weight * starvation_raw 
 
     candidate_data = []
-    best_worker, best_score, best_fairness_val = None, float("-inf"), None
+    best_worker, best_score, best_fairness_val, best_d_pick = None, float("-inf"), None, None
+    one_minus_gamma = 1 - gamma  # loop-invariant EWMA weight
+    pickup_lat, pickup_lon = task.pickup_lat, task.pickup_lon
 
     for worker in nearest_workers:
-        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
+        # Shift already over: no task can finish by the deadline, so skip before scoring
+        if worker.deadline < now:
+            continue
+        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, pickup_lat, pickup_lon)
 
         if not _is_feasible(worker, task, now, d_pick, drop_distance_const):
             continue
 
-        ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
-        fairness_raw = (1 - gamma) * (now - ref_time) + gamma * worker.fairness_ewma
+        ref_time = worker.fairness_anchor_ts
+        fairness_raw = one_minus_gamma * (now - ref_time) + gamma * worker.fairness_ewma
         utility_raw = 1.0 / (1.0 + d_pick)
 
         if normalize_scores:
-            candidate_data.append((worker, fairness_raw, utility_raw))
+            candidate_data.append((worker, fairness_raw, utility_raw, d_pick))
         else:
             # FAST PATH: Avoid list memory allocation
             s = (fairness_weight * fairness_raw) + (utility_weight * utility_raw)
             if s > best_score:
-                best_score, best_worker, best_fairness_val = s, worker, fairness_raw
+                best_score, best_worker, best_fairness_val, best_d_pick = s, worker, fairness_raw, d_pick
 
     # NORMALIZATION PATH
     if normalize_scores and candidate_data:
         f_norm = _normalize_components([c[1] for c in candidate_data])
         u_norm = _normalize_components([c[2] for c in candidate_data])
 
-        for i, (worker, f_raw, u_raw) in enumerate(candidate_data):
+        for i, (worker, f_raw, u_raw, d_pick) in enumerate(candidate_data):
             s = (fairness_weight * f_norm[i]) + (utility_weight * u_norm[i])
             if s > best_score:
-                best_score, best_worker, best_fairness_val = s, worker, f_raw
+                best_score, best_worker, best_fairness_val, best_d_pick = s, worker, f_raw, d_pick
 
     if best_worker is not None:
         best_worker.fairness_ewma = best_fairness_val
-        return best_worker, best_score + starvation_score
+        return best_worker, best_score + starvation_score, best_d_pick
 
-    return None, float("-inf")
+    return None, float("-inf"), None
 
 
 def _find_ranked_assignments_for_task(
@@ -119,23 +126,29 @@ def _find_ranked_assignments_for_task(
     spatial_index,
 ) -> List[Dict[str, Any]]:
     """Return all feasible k-NN candidates sorted by composite score (descending)."""
-    nearest_workers = spatial_index.query_k_nearest(task.pickup_lat, task.pickup_lon, k)
+    nearest_workers = spatial_index.query_k_nearest(
+        task.pickup_lat, task.pickup_lon, k, max_km=max_pickup_km(task.expire_time, now, AVG_SPEED_KMH)
+    )
     if not nearest_workers:
         return []
 
-    drop_distance_const = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
+    drop_distance_const = task.trip_km
     starvation_score = starvation_weight * log(1 + (now - task.release_time))
 
     ranked: List[Dict[str, Any]] = []
     candidate_data = []
+    one_minus_gamma = 1 - gamma  # loop-invariant EWMA weight
+    pickup_lat, pickup_lon = task.pickup_lat, task.pickup_lon
 
     for worker in nearest_workers:
-        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
+        if worker.deadline < now:
+            continue
+        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, pickup_lat, pickup_lon)
         if not _is_feasible(worker, task, now, d_pick, drop_distance_const):
             continue
 
-        ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
-        fairness_raw = (1 - gamma) * (now - ref_time) + gamma * worker.fairness_ewma
+        ref_time = worker.fairness_anchor_ts
+        fairness_raw = one_minus_gamma * (now - ref_time) + gamma * worker.fairness_ewma
         utility_raw = 1.0 / (1.0 + d_pick)
 
         if normalize_scores:
@@ -187,16 +200,18 @@ def _cascade_assign_task(
 
         if accepted:
             worker.fairness_ewma = candidate["fairness_raw"]
-            assigned_task = _commit_assignment(task, worker, now)
+            assigned_task = _commit_assignment(task, worker, now, d_pick)
             state.assign_task(assigned_task, worker)
             return assigned_task, worker, score
 
     return None
 
 
-def _commit_assignment(task, worker, now):
-    pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
-    drop_distance = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
+def _commit_assignment(task, worker, now, pickup_distance=None):
+    # Callers pass the worker->pickup distance they already scored with
+    if pickup_distance is None:
+        pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
+    drop_distance = task.trip_km
     
     task.pickup_km = pickup_distance
     task.drop_km = drop_distance
@@ -252,7 +267,7 @@ def assign_new_tasks_composite(
                 _defer_composite(state, task, now, _)
             continue
 
-        best_worker, best_score = _find_best_assignment_for_task(
+        best_worker, best_score, best_d_pick = _find_best_assignment_for_task(
             task, 
             state.available_workers, 
             now, 
@@ -268,7 +283,7 @@ def assign_new_tasks_composite(
         threshold_passed = (soft_threshold == 0.0) or (best_score >= soft_threshold)
         
         if best_worker and threshold_passed:
-            assigned_task = _commit_assignment(task, best_worker, now)
+            assigned_task = _commit_assignment(task, best_worker, now, best_d_pick)
             state.assign_task(assigned_task, best_worker)
             assignments.append((assigned_task, best_worker, best_score))
         else:
@@ -296,22 +311,22 @@ def _find_ranked_tasks_for_worker(
         worker.start_lat,
         worker.start_lon,
         k=k,
+        max_km=max_pickup_km(worker.deadline, now, AVG_SPEED_KMH),
     )
     if not nearby_tasks:
         return []
 
-    ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+    ref_time = worker.fairness_anchor_ts
     updated_ewma = (1 - gamma) * (now - ref_time) + gamma * worker.fairness_ewma
     fairness_contribution = fairness_weight * updated_ewma
 
     ranked: List[Dict[str, Any]] = []
     candidate_data = []
+    worker_lat, worker_lon = worker.start_lat, worker.start_lon
 
     for task in nearby_tasks:
-        drop_distance_const = fast_manhattan_km(
-            task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon
-        )
-        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
+        drop_distance_const = task.trip_km
+        d_pick = fast_manhattan_km(worker_lat, worker_lon, task.pickup_lat, task.pickup_lon)
 
         if not _is_feasible(worker, task, now, d_pick, drop_distance_const):
             continue
@@ -386,7 +401,7 @@ def match_worker_composite(
             if accepted:
                 task = candidate["task"]
                 worker.fairness_ewma = candidate["updated_ewma"]
-                assigned_task = _commit_assignment(task, worker, now)
+                assigned_task = _commit_assignment(task, worker, now, d_pick)
                 state.assign_task(assigned_task, worker)
                 return (assigned_task, worker, score)
 
@@ -398,24 +413,22 @@ def match_worker_composite(
     nearby_tasks = state.deferred_task_index.query_k_nearest(
         worker.start_lat, 
         worker.start_lon, 
-        k=k
+        k=k,
+        max_km=max_pickup_km(worker.deadline, now, AVG_SPEED_KMH),
     )
     
     if not nearby_tasks:
         return None
 
     candidate_data = []
-    best_task, best_ranking_score = None, float("-inf")
+    best_task, best_ranking_score, best_d_pick = None, float("-inf"), None
+    worker_lat, worker_lon = worker.start_lat, worker.start_lon
     
     for task in nearby_tasks:
-        drop_distance_const = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
-        d_pick = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
-        total_km_tmp = d_pick + drop_distance_const
+        drop_distance_const = task.trip_km
+        d_pick = fast_manhattan_km(worker_lat, worker_lon, task.pickup_lat, task.pickup_lon)
 
-        pickup_eta_seconds = (d_pick / AVG_SPEED_KMH) * 3600
-        finish_eta_seconds = (total_km_tmp / AVG_SPEED_KMH) * 3600
-        
-        if (now + pickup_eta_seconds) > task.expire_time or (now + finish_eta_seconds) > worker.deadline:
+        if not _is_feasible(worker, task, now, d_pick, drop_distance_const):
             continue
 
         starvation_raw = log(1 + (now - task.release_time))
@@ -423,28 +436,28 @@ def match_worker_composite(
         
         if normalize_scores:
             # Use lightweight tuples instead of heavy dicts
-            candidate_data.append((task, starvation_raw, utility_raw))
+            candidate_data.append((task, starvation_raw, utility_raw, d_pick))
         else:
             # FAST PATH: Score immediately, avoiding list memory allocation entirely
             s = (starvation_weight * starvation_raw) + (utility_weight * utility_raw)
             if s > best_ranking_score:
-                best_ranking_score, best_task = s, task
+                best_ranking_score, best_task, best_d_pick = s, task, d_pick
     
     # NORMALIZATION PATH
     if normalize_scores and candidate_data:
         s_norm = _normalize_components([c[1] for c in candidate_data])
         u_norm = _normalize_components([c[2] for c in candidate_data])
         
-        for i, (task, s_raw, u_raw) in enumerate(candidate_data):
+        for i, (task, s_raw, u_raw, d_pick) in enumerate(candidate_data):
             s = (starvation_weight * s_norm[i]) + (utility_weight * u_norm[i])
             if s > best_ranking_score:
-                best_ranking_score, best_task = s, task
+                best_ranking_score, best_task, best_d_pick = s, task, d_pick
                 
     if best_task is None:
         return None
 
     # Calculate final score with fairness contribution
-    ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+    ref_time = worker.fairness_anchor_ts
     T_idle_seconds = now - ref_time
     updated_ewma = (1 - gamma) * T_idle_seconds + gamma * worker.fairness_ewma
     fairness_contribution = fairness_weight * updated_ewma
@@ -457,7 +470,7 @@ def match_worker_composite(
         return None
 
     worker.fairness_ewma = updated_ewma
-    assigned_task = _commit_assignment(best_task, worker, now)
+    assigned_task = _commit_assignment(best_task, worker, now, best_d_pick)
     state.assign_task(assigned_task, worker)
     
     return (assigned_task, worker, best_score)
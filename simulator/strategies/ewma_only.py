@@ -13,22 +13,15 @@ Research Context:
 """
 
 from simulator.strategies import register
-import pandas as pd
 import random
-from math import fabs, cos, radians
+from itertools import chain
+# Shared O(1) flat-earth distance (precomputed longitude scalar) — avoids the
+# per-call cos()/radians() of a local Manhattan helper.
+from simulator.spatial_index import fast_manhattan_km
 
 AVG_SPEED_KMH = 30
 
 
-def manhattan_km(lat1, lon1, lat2, lon2):
-    """Calculate Manhattan distance in kilometers between two points."""
-    km_per_deg = 111
-    d_lat = fabs(lat1 - lat2) * km_per_deg
-    avg_lat = (lat1 + lat2) / 2
-    d_lon = fabs(lon1 - lon2) * km_per_deg * cos(radians(avg_lat))
-    return d_lat + d_lon
-
-
 def calculate_fairness_signal(worker, current_time, fairness_metric='ewma', gamma=0.3):
     """
     Calculate fairness signal for a worker based on EWMA methodology.
@@ -48,7 +41,7 @@ def calculate_fairness_signal(worker, current_time, fairness_metric='ewma', gamm
     if fairness_metric == 'ewma':
         # EWMA Formula: Fairness(w_i) = (1 - γ) · T_idle(w_i) + γ · Previous EWMA
         # Timestamps are plain floats (seconds since epoch) — arithmetic gives seconds directly.
-        ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+        ref_time = worker.fairness_anchor_ts
         T_idle_seconds = current_time - ref_time
 
         current_ewma = (1 - gamma) * T_idle_seconds + gamma * worker.fairness_ewma
@@ -59,7 +52,7 @@ def calculate_fairness_signal(worker, current_time, fairness_metric='ewma', gamm
         return (current_ewma / 3600.0) * worker_bias
 
     elif fairness_metric == 'idle_time':
-        ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+        ref_time = worker.fairness_anchor_ts
         return (current_time - ref_time) / 3600.0
 
     elif fairness_metric == 'task_count':
@@ -67,7 +60,7 @@ def calculate_fairness_signal(worker, current_time, fairness_metric='ewma', gamm
 
     else:
         # Default to EWMA
-        ref_time = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+        ref_time = worker.fairness_anchor_ts
         T_idle_seconds = current_time - ref_time
         current_ewma = (1 - gamma) * T_idle_seconds + gamma * worker.fairness_ewma
         worker.fairness_ewma = current_ewma
@@ -89,10 +82,10 @@ def _commit_assignment(task, worker, now):
     Returns:
         The assigned task object
     """
-    pickup_distance = manhattan_km(worker.start_lat, worker.start_lon, 
-                                   task.pickup_lat, task.pickup_lon)
-    drop_distance = manhattan_km(task.pickup_lat, task.pickup_lon, 
-                                 task.dropoff_lat, task.dropoff_lon)
+    pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, 
+                                        task.pickup_lat, task.pickup_lon)
+    drop_distance = fast_manhattan_km(task.pickup_lat, task.pickup_lon, 
+                                      task.dropoff_lat, task.dropoff_lon)
     
     task.pickup_km = pickup_distance
     task.drop_km = drop_distance
@@ -137,12 +130,12 @@ def assign_new_tasks_ewma_only(state, now, tasks_to_assign, gamma=0.3, **_):
         best_fairness_signal = float("-inf")
         best_dist = float("inf")  # Tie-breaker
         
-        drop_dist = manhattan_km(task.pickup_lat, task.pickup_lon, 
-                                task.dropoff_lat, task.dropoff_lon)
+        drop_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon, 
+                                     task.dropoff_lat, task.dropoff_lon)
         
         for worker in state.available_workers:
-            pickup_dist = manhattan_km(worker.start_lat, worker.start_lon,
-                                      task.pickup_lat, task.pickup_lon)
+            pickup_dist = fast_manhattan_km(worker.start_lat, worker.start_lon,
+                                           task.pickup_lat, task.pickup_lon)
             
             # Feasibility check: pickup before expiry, finish before worker shift ends
             pickup_eta = now + ((pickup_dist / AVG_SPEED_KMH) * 3600)
@@ -188,19 +181,19 @@ def match_worker_ewma_only(state, now, worker, **_):
     that arrived while workers existed but found no feasible match) to ensure no
     pending task is missed.
     """
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
     best_task = None
     best_dist = float("inf")
 
-    for task in pending:
-        pickup_dist = manhattan_km(worker.start_lat, worker.start_lon,
-                                  task.pickup_lat, task.pickup_lon)
+    # Read-only pass, so walk both pools in place instead of concatenating copies
+    for task in chain(state.deferred_tasks, state.active_tasks):
+        pickup_dist = fast_manhattan_km(worker.start_lat, worker.start_lon,
+                                       task.pickup_lat, task.pickup_lon)
 
-        drop_dist = manhattan_km(task.pickup_lat, task.pickup_lon,
-                                task.dropoff_lat, task.dropoff_lon)
+        drop_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon,
+                                     task.dropoff_lat, task.dropoff_lon)
         pickup_eta = now + ((pickup_dist / AVG_SPEED_KMH) * 3600)
         finish_eta = now + (((pickup_dist + drop_dist) / AVG_SPEED_KMH) * 3600)
 
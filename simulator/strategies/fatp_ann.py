@@ -130,8 +130,8 @@ def _calculate_utility(task, worker_lat, worker_lon, worker_time, mu, alpha_scal
     # Wait time since release, normalized to hours (simulator timestamps are seconds).
     # Paper: u_r = alpha_r * exp(-mu * (f_r - b_r)); mu is dataset-specific — tune
     # in config.py so decay is comparable across datasets (see module docstring).
-    release_time_float = task.release_time if isinstance(task.release_time, (int, float)) else task.release_time.timestamp()
-    wait_time_hours = (completion_time - release_time_float) / 3600.0
+    # Task.release_time is already float seconds (converted once at load)
+    wait_time_hours = (completion_time - task.release_time) / 3600.0
 
     base_utility = task.base_utility * alpha_scale
     utility = base_utility * exp(-mu * wait_time_hours)
@@ -150,14 +150,14 @@ def _is_valid_assignment(worker, task, now):
     Args:
         worker: Worker object
         task: Task object
-        now: Current simulation time
+        now: Current simulation time (float seconds; the handlers normalise it
+             once with _ensure_timestamp before scanning candidates)
     
     Returns:
         Tuple[bool, float]: (validity, pickup_dist). The pickup distance is
         returned so callers can reuse it for nearest-worker selection instead
         of recomputing it.
     """
-    now = _ensure_timestamp(now)
     pickup_dist = fast_manhattan_km(worker.start_lat, worker.start_lon,
                                     task.pickup_lat, task.pickup_lon)
     service_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon,
@@ -363,8 +363,7 @@ def match_worker_fatp_ann(state, now, worker,
     if fairness_cap_tracker is None:
         raise ValueError("fairness_cap_tracker must be provided to FATP-ANN strategy")
 
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
     now = _ensure_timestamp(now)
@@ -1,13 +1,19 @@
+from itertools import chain
+
+import numpy as np
+
 from simulator.strategies import register
-from simulator.spatial_index import fast_manhattan_km
+from simulator.spatial_index import fast_manhattan_km, fast_manhattan_km_array, max_pickup_km
 from simulator.behavior import evaluate_worker_acceptance
 from typing import Optional, Dict, Any, List
 
 AVG_SPEED_KMH = 30
 
-def _commit_assignment(task, worker, now):
-    pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
-    drop_distance = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
+def _commit_assignment(task, worker, now, pickup_distance=None):
+    # Callers pass the worker->pickup distance they already ranked on
+    if pickup_distance is None:
+        pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
+    drop_distance = task.trip_km
     
     task.pickup_km = pickup_distance
     task.drop_km = drop_distance
@@ -45,7 +51,7 @@ def _defer(state, task, now, kwargs):
             expiry_scheduler(task)
         deferral_tracker = kwargs.get("deferral_tracker")
         if deferral_tracker:
-            deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_candidates")
+            deferral_tracker.record_deferral(task.id, now, 0.0, "no_candidates")
 
 
 def assign_new_tasks_greedy(
@@ -77,15 +83,20 @@ def assign_new_tasks_greedy(
             continue
 
         # Fix 1: compute once per task — independent of which worker we test
-        drop_dist = fast_manhattan_km(
-            task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon
-        )
+        drop_dist = task.trip_km
         # Fix 2: k nearest workers via spatial index, sorted by distance ascending
-        candidates = state.spatial_index.query_k_nearest(task.pickup_lat, task.pickup_lon, k)
+        # Workers farther than the task's remaining pickup window are infeasible
+        candidates = state.spatial_index.query_k_nearest(
+            task.pickup_lat, task.pickup_lon, k,
+            max_km=max_pickup_km(task.expire_time, now, AVG_SPEED_KMH),
+        )
 
         if acceptance_enabled:
             ranked: List[tuple] = []
             for worker in candidates:
+                # Shift already over: no task can finish by the deadline, so skip before scoring
+                if worker.deadline < now:
+                    continue
                 pickup_dist = fast_manhattan_km(
                     worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
                 )
@@ -99,7 +110,7 @@ def assign_new_tasks_greedy(
                 accepted = evaluate_worker_acceptance(pickup_dist, worker_acceptance)
                 _record_offer(state, accepted)
                 if accepted:
-                    assigned_task = _commit_assignment(task, worker, now)
+                    assigned_task = _commit_assignment(task, worker, now, pickup_dist)
                     state.assign_task(assigned_task, worker)
                     assignments.append((assigned_task, worker, pickup_dist))
                     assigned = True
@@ -112,6 +123,8 @@ def assign_new_tasks_greedy(
         # Candidates are distance-sorted: iterate and stop at the first feasible worker.
         best_worker, best_dist = None, float("inf")
         for worker in candidates:
+            if worker.deadline < now:
+                continue
             pickup_dist = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
@@ -122,7 +135,7 @@ def assign_new_tasks_greedy(
             break  # first feasible in a distance-sorted list is the nearest feasible
 
         if best_worker:
-            assigned_task = _commit_assignment(task, best_worker, now)
+            assigned_task = _commit_assignment(task, best_worker, now, best_dist)
             state.assign_task(assigned_task, best_worker)
             assignments.append((assigned_task, best_worker, best_dist))
         else:
@@ -147,21 +160,19 @@ def match_worker_greedy(
     Active_tasks is also included to catch any tasks that arrived at the same
     simulation timestep and have not yet been processed.
     """
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
     acceptance_enabled = worker_acceptance and worker_acceptance.get("enabled", False)
 
     if acceptance_enabled:
         ranked: List[tuple] = []
-        for task in pending:
+        # Ranked before any assignment, so the live pools can be walked in place
+        for task in chain(state.deferred_tasks, state.active_tasks):
             pickup_dist = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
-            drop_dist = fast_manhattan_km(
-                task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon
-            )
+            drop_dist = task.trip_km
             if not _is_feasible_greedy(worker, task, now, pickup_dist, drop_dist):
                 continue
             ranked.append((pickup_dist, task))
@@ -171,31 +182,36 @@ def match_worker_greedy(
             accepted = evaluate_worker_acceptance(pickup_dist, worker_acceptance)
             _record_offer(state, accepted)
             if accepted:
-                assigned_task = _commit_assignment(task, worker, now)
+                assigned_task = _commit_assignment(task, worker, now, pickup_dist)
                 state.assign_task(assigned_task, worker)
                 return (assigned_task, worker, pickup_dist)
 
         return None
 
-    best_task, best_dist = None, float("inf")
-
-    for task in pending:
-        pickup_dist = fast_manhattan_km(worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon)
-        drop_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon)
-
-        if not _is_feasible_greedy(worker, task, now, pickup_dist, drop_dist):
-            continue
-
-        if pickup_dist < best_dist:
-            best_dist = pickup_dist
-            best_task = task
+    # Whole-pool scan in NumPy: one distance vector, one feasibility mask, one
+    # argmin. Same arithmetic as _is_feasible_greedy, and argmin keeps the
+    # first of equal distances, as the strict '<' loop did.
+    # Indexed below, so this path does need one list of the pool
+    pending = [*state.deferred_tasks, *state.active_tasks]
+    n = len(pending)
+    pickup_lat = np.fromiter((t.pickup_lat for t in pending), dtype=np.float64, count=n)
+    pickup_lon = np.fromiter((t.pickup_lon for t in pending), dtype=np.float64, count=n)
+    expire_time = np.fromiter((t.expire_time for t in pending), dtype=np.float64, count=n)
+    # trip_km, not core_movement_cost_km: reset() may have re-set the city constants
+    drop_dist = np.fromiter((t.trip_km for t in pending), dtype=np.float64, count=n)
+    pickup_dist = fast_manhattan_km_array(worker.start_lat, worker.start_lon, pickup_lat, pickup_lon)
+    pickup_eta = now + ((pickup_dist / AVG_SPEED_KMH) * 3600)
+    finish_eta = now + (((pickup_dist + drop_dist) / AVG_SPEED_KMH) * 3600)
+    feasible = (pickup_eta <= expire_time) & (finish_eta <= worker.deadline)
+    if not feasible.any():
+        return None
 
-    if best_task:
-        assigned_task = _commit_assignment(best_task, worker, now)
-        state.assign_task(assigned_task, worker)
-        return (assigned_task, worker, best_dist)
+    best = int(np.argmin(np.where(feasible, pickup_dist, np.inf)))
+    best_task, best_dist = pending[best], float(pickup_dist[best])
 
-    return None
+    assigned_task = _commit_assignment(best_task, worker, now, best_dist)
+    state.assign_task(assigned_task, worker)
+    return (assigned_task, worker, best_dist)
 
 
 @register("greedy")
@@ -60,7 +60,7 @@ def _defer(state, task, now, kwargs):
             expiry_scheduler(task)
         deferral_tracker = kwargs.get("deferral_tracker")
         if deferral_tracker:
-            deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_k_candidates")
+            deferral_tracker.record_deferral(task.id, now, 0.0, "no_k_candidates")
 
 
 def assign_new_tasks_knlf(state, now, tasks_to_assign, k=15, **_):
@@ -95,6 +95,9 @@ def assign_new_tasks_knlf(state, now, tasks_to_assign, k=15, **_):
         best_dist   = float("inf")
 
         for worker in nearest:
+            # Shift already over: no task can finish by the deadline, so skip before scoring
+            if worker.deadline < now:
+                continue
             pickup_km = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
@@ -33,6 +33,8 @@ k-NTF-IR    Temporal Fairness ("Idle Ratio")
 FREE_WORKER handler (both variants): identical to Greedy/k-NLF — nearest feasible task.
 """
 
+from itertools import chain
+
 from simulator.strategies import register
 from simulator.spatial_index import fast_manhattan_km
 
@@ -48,7 +50,7 @@ def _defer(state, task, now, kwargs):
             expiry_scheduler(task)
         deferral_tracker = kwargs.get("deferral_tracker")
         if deferral_tracker:
-            deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_k_candidates")
+            deferral_tracker.record_deferral(task.id, now, 0.0, "no_k_candidates")
 
 
 def _commit_assignment(task, worker, now):
@@ -122,6 +124,9 @@ def assign_new_tasks_kntf_eph(state, now, tasks_to_assign, k=15, **_):
         best_dist    = float("inf")
 
         for worker in nearest:
+            # Shift already over: no task can finish by the deadline, so skip before scoring
+            if worker.deadline < now:
+                continue
             pickup_km = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
@@ -150,14 +155,13 @@ def match_worker_kntf(state, now, worker, **_):
     FREE_WORKER: greedy nearest-task selection (same as Greedy / k-NLF).
     The temporal fairness signal applies at task-assignment time only.
     """
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
     best_task = None
     best_dist = float("inf")
 
-    for task in pending:
+    for task in chain(state.deferred_tasks, state.active_tasks):
         pickup_km = fast_manhattan_km(
             worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
         )
@@ -208,6 +212,8 @@ def assign_new_tasks_kntf_ir(state, now, tasks_to_assign, k=15, **_):
         best_dist   = float("inf")
 
         for worker in nearest:
+            if worker.deadline < now:
+                continue
             pickup_km = fast_manhattan_km(
                 worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
             )
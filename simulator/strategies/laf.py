@@ -10,6 +10,8 @@ Research Context:
 - No spatial optimization (assigns to least-loaded worker regardless of distance)
 """
 
+from itertools import chain
+
 from simulator.strategies import register
 from simulator.spatial_index import fast_manhattan_km
 
@@ -126,14 +128,13 @@ def match_worker_laf(state, now, worker, **_):
     available at arrival) and active_tasks (tasks that arrived while workers existed
     but found no feasible match) to ensure no pending task is missed.
     """
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
     best_task = None
     best_dist = float("inf")
 
-    for task in pending:
+    for task in chain(state.deferred_tasks, state.active_tasks):
         pickup_dist = fast_manhattan_km(worker.start_lat, worker.start_lon,
                                         task.pickup_lat, task.pickup_lon)
 
@@ -17,7 +17,7 @@ from __future__ import annotations
 import numpy as np
 
 from simulator.strategies import register
-from simulator.spatial_index import fast_manhattan_km
+from simulator.spatial_index import attribute_column, fast_manhattan_km, fast_manhattan_km_matrix
 
 AVG_SPEED_KMH = 30.0
 _INFEASIBLE_COST = 1e18
@@ -46,28 +46,33 @@ def _commit_assignment(task, worker, now):
     return task
 
 
-def _pair_delay_seconds(worker, task, now: float) -> float | None:
+def _pair_delay_matrix(workers, tasks, now: float) -> np.ndarray:
     """
-    Total delay from task release until completion if this pair is assigned at `now`.
-    Returns None if infeasible (cannot pick up before expiry or finish before worker deadline).
+    (n_workers, n_tasks) total delay from task release until completion if each
+    pair is assigned at `now`, clamped at 0. Infeasible pairs (cannot pick up
+    before expiry or finish before worker deadline) hold _INFEASIBLE_COST.
     """
-    d_pick = fast_manhattan_km(
-        worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
+    d_pick = fast_manhattan_km_matrix(
+        attribute_column(workers, "start_lat"), attribute_column(workers, "start_lon"),
+        attribute_column(tasks, "pickup_lat"), attribute_column(tasks, "pickup_lon"),
     )
-    d_drop = fast_manhattan_km(
-        task.pickup_lat, task.pickup_lon, task.dropoff_lat, task.dropoff_lon
+    d_drop = np.fromiter(
+        (fast_manhattan_km(t.pickup_lat, t.pickup_lon, t.dropoff_lat, t.dropoff_lon) for t in tasks),
+        dtype=np.float64, count=len(tasks),
     )
 
     pickup_eta = now + (d_pick / AVG_SPEED_KMH) * 3600.0
     finish_eta = now + ((d_pick + d_drop) / AVG_SPEED_KMH) * 3600.0
+    infeasible = (
+        (pickup_eta > attribute_column(tasks, "expire_time"))
+        | (finish_eta > attribute_column(workers, "deadline")[:, None])
+    )
 
-    if pickup_eta > task.expire_time or finish_eta > worker.deadline:
-        return None
-
-    wait = now - task.release_time
+    wait = now - attribute_column(tasks, "release_time")
     travel_pick = (d_pick / AVG_SPEED_KMH) * 3600.0
     travel_drop = (d_drop / AVG_SPEED_KMH) * 3600.0
-    return wait + travel_pick + travel_drop
+    delay = np.maximum(0.0, wait + travel_pick + travel_drop)
+    return np.where(infeasible, _INFEASIBLE_COST, delay)
 
 
 def _batch_min_sum_power_delay(state, now: float, **_ignore) -> list:
@@ -81,14 +86,8 @@ def _batch_min_sum_power_delay(state, now: float, **_ignore) -> list:
     if not workers or not tasks:
         return []
 
-    n_w, n_t = len(workers), len(tasks)
-    raw = np.full((n_w, n_t), _INFEASIBLE_COST, dtype=np.float64)
-
-    for i, w in enumerate(workers):
-        for j, t in enumerate(tasks):
-            dsec = _pair_delay_seconds(w, t, now)
-            if dsec is not None:
-                raw[i, j] = max(0.0, float(dsec))
+    # One broadcast pass over every (worker, task) pair
+    raw = _pair_delay_matrix(workers, tasks, now)
 
     # Min-max emphasis: minimize sum of delay^p
     powered = np.where(raw >= _INFEASIBLE_COST / 2, _INFEASIBLE_COST, np.power(raw, _DELAY_POWER))
@@ -155,15 +155,20 @@ def _process_arrival(
 
     if is_stage_two:
         # Alg. 3: global optimal over pruned pending sets; commit only if arrival in match.
+        # Membership checks go against the state's sets (O(1)), not the lists.
         tasks = _pending_tasks(state)
-        if is_task and entity not in tasks:
+        if is_task and entity not in state.deferred_tasks and entity not in state.active_tasks:
             tasks.append(entity)
 
         workers = list(state.available_workers)
-        if not is_task and entity not in workers:
+        if not is_task and entity not in state.available_workers:
             workers.append(entity)
 
         optimal_pairs = _solve_global_optimal(tasks, workers, now)
+        # The matching is one-to-one; invert it once for O(1) worker -> task lookup
+        matched_task = (
+            None if is_task else {w: t for t, w in optimal_pairs.items()}.get(entity)
+        )
 
         if is_task and entity in optimal_pairs:
             worker = optimal_pairs[entity]
@@ -172,8 +177,8 @@ def _process_arrival(
             state.assign_task(assigned_task, worker)
             assignments.append((assigned_task, worker, score))
             assigned = True
-        elif not is_task and entity in optimal_pairs.values():
-            task = next(t for t, w in optimal_pairs.items() if w is entity)
+        elif matched_task is not None:
+            task = matched_task
             _, score, d_pick = _pair_utility(entity, task, now)
             assigned_task = _commit_assignment(task, entity, now, d_pick)
             state.assign_task(assigned_task, entity)
@@ -197,7 +202,7 @@ def _process_arrival(
                 if expiry_scheduler:
                     expiry_scheduler(entity)
                 if deferral_tracker:
-                    deferral_tracker.record_deferral(str(entity.id), now, 0.0, "no_candidates")
+                    deferral_tracker.record_deferral(entity.id, now, 0.0, "no_candidates")
 
     return assignments
 
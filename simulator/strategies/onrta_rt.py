@@ -164,7 +164,7 @@ def _process_entity(
             if expiry_scheduler:
                 expiry_scheduler(entity)
             if deferral_tracker:
-                deferral_tracker.record_deferral(str(entity.id), now, 0.0, "no_candidates")
+                deferral_tracker.record_deferral(entity.id, now, 0.0, "no_candidates")
 
     return assignments
 
@@ -6,32 +6,26 @@ For RQ4.2: Tests the impact of purely random (but spatially-constrained) assignm
 as a null hypothesis baseline.
 """
 
+import heapq
 import random
-import pandas as pd
+from itertools import chain
 from simulator.strategies import register
-from math import fabs, cos, radians
+# Shared O(1) flat-earth distance (precomputed longitude scalar) — avoids the
+# per-call cos()/radians() of a local Manhattan helper.
+from simulator.spatial_index import fast_manhattan_km
 
 AVG_SPEED_KMH = 30
 
 
-def manhattan_km(lat1, lon1, lat2, lon2):
-    """Calculate Manhattan distance in kilometers between two points."""
-    km_per_deg = 111
-    d_lat = fabs(lat1 - lat2) * km_per_deg
-    avg_lat = (lat1 + lat2) / 2
-    d_lon = fabs(lon1 - lon2) * km_per_deg * cos(radians(avg_lat))
-    return d_lat + d_lon
-
-
 def _commit_assignment(task, worker, now):
     """
     Commit a task assignment to a worker.
     Calculates timing, updates task and worker state.
     """
-    pickup_distance = manhattan_km(worker.start_lat, worker.start_lon, 
-                                   task.pickup_lat, task.pickup_lon)
-    drop_distance = manhattan_km(task.pickup_lat, task.pickup_lon, 
-                                 task.dropoff_lat, task.dropoff_lon)
+    pickup_distance = fast_manhattan_km(worker.start_lat, worker.start_lon, 
+                                        task.pickup_lat, task.pickup_lon)
+    drop_distance = fast_manhattan_km(task.pickup_lat, task.pickup_lon, 
+                                      task.dropoff_lat, task.dropoff_lon)
     
     task.pickup_km = pickup_distance
     task.drop_km = drop_distance
@@ -48,7 +42,7 @@ def _commit_assignment(task, worker, now):
     return task
 
 
-def assign_new_tasks_random(state, now, tasks_to_assign, **kwargs):
+def assign_new_tasks_random(state, now, tasks_to_assign, random_assign_rng=None, **kwargs):
     """
     Randomly assign new tasks to available workers from k=15 nearest candidates.
     
@@ -60,7 +54,11 @@ def assign_new_tasks_random(state, now, tasks_to_assign, **kwargs):
     2. Filter for feasible workers (can meet pickup/deadline constraints)
     3. RANDOMLY select one worker from feasible set (no optimization)
     4. Defer task if no feasible worker exists
+
+    Draws come from random_assign_rng (a random.Random injected per run by
+    EventSimulator.reset()), falling back to the global random module.
     """
+    rng = random_assign_rng or random
     strategy_params = kwargs.get('strategy_params', {})
     k = strategy_params.get('k', 15)
     assignments = []
@@ -68,19 +66,17 @@ def assign_new_tasks_random(state, now, tasks_to_assign, **kwargs):
     for task in tasks_to_assign:
         feasible_workers = []
         
-        drop_dist = manhattan_km(task.pickup_lat, task.pickup_lon, 
-                                task.dropoff_lat, task.dropoff_lon)
+        drop_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon, 
+                                     task.dropoff_lat, task.dropoff_lon)
         
-        # Collect k nearest workers by distance
-        worker_distances = []
-        for worker in state.available_workers:
-            pickup_dist = manhattan_km(worker.start_lat, worker.start_lon,
-                                      task.pickup_lat, task.pickup_lon)
-            worker_distances.append((worker, pickup_dist))
-        
-        # Sort by distance and take k nearest
-        worker_distances.sort(key=lambda x: x[1])
-        nearest_k = worker_distances[:k]
+        # k nearest workers by distance (nsmallest == sorted(...)[:k], ties included)
+        nearest_k = heapq.nsmallest(
+            k,
+            ((worker, fast_manhattan_km(worker.start_lat, worker.start_lon,
+                                        task.pickup_lat, task.pickup_lon))
+             for worker in state.available_workers),
+            key=lambda x: x[1],
+        )
         
         # Check feasibility for k nearest workers
         for worker, pickup_dist in nearest_k:
@@ -95,7 +91,7 @@ def assign_new_tasks_random(state, now, tasks_to_assign, **kwargs):
         
         # RANDOM SELECTION: Pick random feasible worker (no optimization)
         if feasible_workers:
-            selected_worker, pickup_dist, drop_dist = random.choice(feasible_workers)
+            selected_worker, pickup_dist, drop_dist = rng.choice(feasible_workers)
             assigned_task = _commit_assignment(task, selected_worker, now)
             state.assign_task(assigned_task, selected_worker)
             assignments.append((assigned_task, selected_worker, pickup_dist))
@@ -106,7 +102,7 @@ def assign_new_tasks_random(state, now, tasks_to_assign, **kwargs):
     return assignments
 
 
-def match_worker_random(state, now, worker, **kwargs):
+def match_worker_random(state, now, worker, random_assign_rng=None, **kwargs):
     """
     When a worker becomes free, randomly assign from available tasks (if any nearby).
 
@@ -118,27 +114,26 @@ def match_worker_random(state, now, worker, **kwargs):
     Scans both deferred_tasks and active_tasks so that tasks deferred by the simulator
     (no workers at arrival time) are also eligible for recovery.
     """
+    rng = random_assign_rng or random
     strategy_params = kwargs.get('strategy_params', {})
     k = strategy_params.get('k', 15)
 
-    pending = list(state.deferred_tasks) + list(state.active_tasks)
-    if not pending:
+    if not state.deferred_tasks and not state.active_tasks:
         return None
 
-    # Collect k nearest tasks by distance from the combined pool
-    task_distances = []
-    for task in pending:
-        pickup_dist = manhattan_km(worker.start_lat, worker.start_lon,
-                                  task.pickup_lat, task.pickup_lon)
-        task_distances.append((task, pickup_dist))
-
-    task_distances.sort(key=lambda x: x[1])
-    nearest_k = task_distances[:k]
+    # k nearest tasks by distance from the combined pool
+    nearest_k = heapq.nsmallest(
+        k,
+        ((task, fast_manhattan_km(worker.start_lat, worker.start_lon,
+                                  task.pickup_lat, task.pickup_lon))
+         for task in chain(state.deferred_tasks, state.active_tasks)),
+        key=lambda x: x[1],
+    )
 
     feasible_tasks = []
     for task, pickup_dist in nearest_k:
-        drop_dist = manhattan_km(task.pickup_lat, task.pickup_lon,
-                                task.dropoff_lat, task.dropoff_lon)
+        drop_dist = fast_manhattan_km(task.pickup_lat, task.pickup_lon,
+                                     task.dropoff_lat, task.dropoff_lon)
         pickup_eta = now + ((pickup_dist / AVG_SPEED_KMH) * 3600)
         finish_eta = now + (((pickup_dist + drop_dist) / AVG_SPEED_KMH) * 3600)
 
@@ -148,7 +143,7 @@ def match_worker_random(state, now, worker, **kwargs):
         feasible_tasks.append((task, pickup_dist, drop_dist))
 
     if feasible_tasks:
-        task, pickup_dist, drop_dist = random.choice(feasible_tasks)
+        task, pickup_dist, drop_dist = rng.choice(feasible_tasks)
         assigned_task = _commit_assignment(task, worker, now)
         state.assign_task(assigned_task, worker)
         return (assigned_task, worker, pickup_dist)
@@ -103,7 +103,7 @@ def _is_feasible(worker, task, now: float, d_pick: float, drop_distance: float)
 
 
 def _worker_idle_seconds(worker, now: float) -> float:
-    ref = worker.last_active_ts if worker.last_active_ts is not None else worker.release_time
+    ref = worker.fairness_anchor_ts
     return now - ref
 
 
@@ -125,6 +125,9 @@ def _best_feasible_pair_for_task(
     for worker in nearest_workers:
         if worker not in state.available_workers:
             continue
+        # Shift already over: no task can finish by the deadline, so skip before scoring
+        if worker.deadline < now:
+            continue
         d_pick = fast_manhattan_km(
             worker.start_lat, worker.start_lon, task.pickup_lat, task.pickup_lon
         )
@@ -288,7 +291,7 @@ def assign_new_tasks_tsgf(
             if expiry_scheduler:
                 expiry_scheduler(task)
             if deferral_tracker:
-                deferral_tracker.record_deferral(str(task.id), now, 0.0, "no_candidates")
+                deferral_tracker.record_deferral(task.id, now, 0.0, "no_candidates")
 
     return _sample_and_dispatch(state, now, alpha, beta, gamma, k, seed)
 